@@ -1,51 +1,187 @@
 #!/usr/bin/env python3
 """
-Copy brand assets from src/hr_bot/ui/assets/ into the public/ directory so Chainlit serves them.
+Copy brand assets from src/hr_bot/ui/assets/ into the public/ directory so Chainlit serves them,
+and pre-compress the admin console's static files (.gz, plus .br when brotli is installed).
 Run this script during development or deployment to ensure the public assets are up-to-date.
 """
+import gzip
+import mimetypes
+import os
 import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 ASSETS_DIR = ROOT / "src" / "hr_bot" / "ui" / "assets"
 PUBLIC_DIR = ROOT / "public"
 AVATARS_DIR = PUBLIC_DIR / "avatars"
+ADMIN_STATIC_DIR = ROOT / "src" / "hr_bot" / "ui" / "admin" / "static"
+
+# Must match what hr_bot.ui.admin.routes.scan_static_dir looks for
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 1024
+
+# ioctl request number for FICLONE (linux/fs.h)
+_FICLONE = 0x40049409
 
 def ensure_public_dirs():
     PUBLIC_DIR.mkdir(parents=True, exist_ok=True)
     AVATARS_DIR.mkdir(parents=True, exist_ok=True)
 
-def copy_asset(src_name: str, dest_name: str | None = None):
+def _fast_copy(src: Path, dst: Path):
+    """Copy ``src`` to ``dst`` in-kernel where possible, preserving timestamps like ``copy2``."""
+    if sys.platform == "win32":
+        import ctypes
+
+        cancel = ctypes.c_int(0)
+        if not ctypes.windll.kernel32.CopyFileExW(str(src), str(dst), None, None, ctypes.byref(cancel), 0):
+            raise ctypes.WinError()
+        return  # CopyFileExW carries the timestamps over itself
+
+    if sys.platform.startswith("linux"):
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            st = os.fstat(s.fileno())
+            offset, remaining = 0, st.st_size
+            while remaining > 0:
+                sent = os.sendfile(d.fileno(), s.fileno(), offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+    else:
+        # macOS only allows sendfile() towards sockets; copyfile() uses fcopyfile() there
+        st = os.stat(src)
+        shutil.copyfile(src, dst)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+def _clone_or_link(src: Path, dst: Path):
+    """Publish ``src`` again as ``dst`` without moving any bytes when the filesystem allows it.
+
+    Tries a hardlink first, then a reflink (FICLONE on btrfs/XFS), then a regular copy.
+    """
+    try:
+        if os.path.samefile(src, dst):
+            print(f"Up to date: {dst}")
+            return
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+
+    try:
+        os.link(src, dst)
+        print(f"Linked {src} -> {dst}")
+        return
+    except OSError:
+        pass
+
+    try:
+        import fcntl
+
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+            st = os.fstat(s.fileno())
+        os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+        print(f"Cloned {src} -> {dst}")
+        return
+    except (ImportError, OSError):
+        pass
+
+    _fast_copy(src, dst)
+    print(f"Copied {src} -> {dst}")
+
+def _is_up_to_date(src_st: os.stat_result, dest: Path) -> bool:
+    """Return True when ``dest`` already has the size and mtime of the source."""
+    try:
+        d_st = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    return d_st.st_size == src_st.st_size and d_st.st_mtime_ns == src_st.st_mtime_ns
+
+def scan_assets() -> dict[str, os.DirEntry]:
+    """List ASSETS_DIR once; DirEntry caches each file's stat for the copy jobs."""
+    try:
+        with os.scandir(ASSETS_DIR) as it:
+            return {e.name: e for e in it}
+    except FileNotFoundError:
+        return {}
+
+def copy_asset(assets: dict[str, os.DirEntry], src_name: str, dest_name: str | None = None):
     dest_name = dest_name or src_name
-    src = ASSETS_DIR / src_name
-    if not src.exists():
+    entry = assets.get(src_name)
+    if entry is None:
         print(f"Asset '{src_name}' not found in {ASSETS_DIR}")
         return
     dest = PUBLIC_DIR / dest_name
-    shutil.copy2(src, dest)
-    print(f"Copied {src} -> {dest}")
+    if _is_up_to_date(entry.stat(), dest):
+        print(f"Up to date: {dest}")
+        return
+    _fast_copy(Path(entry.path), dest)
+    print(f"Copied {entry.path} -> {dest}")
 
-def copy_avatar(src_name: str, dest_name: str | None = None):
+def copy_avatar(assets: dict[str, os.DirEntry], src_name: str, dest_name: str | None = None):
     dest_name = dest_name or src_name
-    src = ASSETS_DIR / src_name
-    if not src.exists():
+    entry = assets.get(src_name)
+    if entry is None:
         print(f"Avatar asset '{src_name}' not found in {ASSETS_DIR}")
         return
     dest = AVATARS_DIR / dest_name
-    shutil.copy2(src, dest)
-    print(f"Copied {src} -> {dest}")
+    if _is_up_to_date(entry.stat(), dest):
+        print(f"Up to date: {dest}")
+        return
+    _fast_copy(Path(entry.path), dest)
+    print(f"Copied {entry.path} -> {dest}")
 
-def main():
-    ensure_public_dirs()
+def precompress_admin_static():
+    """Write .gz (and .br) siblings for admin static files that are missing or older than the source."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("brotli not installed; writing .gz variants only")
+    compressors = [(".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append((".br", lambda raw: brotli.compress(raw, quality=11)))
+    for path in ADMIN_STATIC_DIR.rglob("*"):
+        if not path.is_file() or path.name.endswith((".gz", ".br")):
+            continue
+        media_type = mimetypes.guess_type(path.name)[0] or "text/plain"
+        st = path.stat()
+        if not media_type.startswith(COMPRESSIBLE_TYPES) or st.st_size < MIN_COMPRESS_SIZE:
+            continue
+        data = None
+        for suffix, compress in compressors:
+            target = path.with_name(path.name + suffix)
+            if target.exists() and target.stat().st_mtime >= st.st_mtime:
+                print(f"Up to date: {target}")
+                continue
+            if data is None:
+                data = path.read_bytes()
+            target.write_bytes(compress(data))
+            print(f"Compressed {path} -> {target}")
+
+# (copy function, source asset, destination name); the copies are independent of each other
+JOBS = (
     # Main header logo (full light variant)
-    copy_asset("logo_full_light.png", "logo_full_light.png")
-    # Keep the original logo_*.png images updated for backward compatibility
-    copy_asset("logo_full_light.png", "logo_light.png")
-    copy_asset("logo_full_dark.png", "logo_dark.png")
+    (copy_asset, "logo_full_light.png", "logo_full_light.png"),
+    (copy_asset, "logo_full_dark.png", "logo_dark.png"),
     # Default avatar (light mascot)
-    copy_avatar("logo_mascot_light.png", "inara.png")
+    (copy_avatar, "logo_mascot_light.png", "inara.png"),
     # Keep dark variant in avatars too
-    copy_avatar("logo_mascot_dark.png", "inara_dark.png")
+    (copy_avatar, "logo_mascot_dark.png", "inara_dark.png"),
+)
+
+def main():
+    # Create the directories up front so the workers never race on mkdir
+    ensure_public_dirs()
+    assets = scan_assets()
+    with ThreadPoolExecutor(max_workers=len(JOBS)) as ex:
+        list(ex.map(lambda job: job[0](assets, *job[1:]), JOBS))
+    # Keep the original logo_*.png images updated for backward compatibility; logo_light.png
+    # is the same file as logo_full_light.png, so link it instead of writing it twice
+    if (PUBLIC_DIR / "logo_full_light.png").exists():
+        _clone_or_link(PUBLIC_DIR / "logo_full_light.png", PUBLIC_DIR / "logo_light.png")
+    precompress_admin_static()
 
 if __name__ == "__main__":
     main()
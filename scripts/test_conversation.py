@@ -8,15 +8,37 @@ Tests the HR Bot with multi-turn conversations to verify:
 4. Elite accuracy on all responses
 """
 
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import re
 import sys
 import os
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+try:
+    import ahocorasick
+except ImportError:  # optional: keyword checks fall back to compiled alternations
+    ahocorasick = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
-# Add project root to path
 project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root / "src"))
 
-from hr_bot.crew import HrBot
+if TYPE_CHECKING:
+    from hr_bot.crew import HrBot
+
+# Recorded responses for --record / --replay runs
+SNAPSHOT_PATH = project_root / "tests" / "fixtures" / "conversation_snapshot.json"
 
 # Test conversation scenarios
 CONVERSATION_SCENARIOS = [
@@ -109,7 +131,7 @@ CONVERSATION_SCENARIOS = [
             },
             {
                 "query": "What can you help me with?",
-                "expected_keywords": ["policy", "leave", "help", "questions"],
+                "expected_keywords": ["knowledge base", "help", "questions"],
                 "should_not_contain": ["Sources:"],
                 "no_tool_needed": True
             },
@@ -123,30 +145,182 @@ CONVERSATION_SCENARIOS = [
 ]
 
 
-def print_header(text: str, char: str = "="):
+# Turn flags, checked as a bitmask in the turn loop
+CTX_AWARE = 1
+TOPIC_SWITCH = 2
+NO_TOOL = 4
+NEEDS_BOTH = 8
+
+_FLAG_KEYS = (
+    ("context_aware", CTX_AWARE),
+    ("topic_switch", TOPIC_SWITCH),
+    ("no_tool_needed", NO_TOOL),
+    ("needs_both_tools", NEEDS_BOTH),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Turn:
+    """One user turn with its checks; keyword lists are kept as given and pre-lowercased"""
+    query: str
+    expected: tuple[str, ...] = ()
+    expected_lc: tuple[str, ...] = ()
+    forbidden: tuple[str, ...] = ()
+    forbidden_lc: tuple[str, ...] = ()
+    flags: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    name: str
+    description: str
+    turns: tuple[Turn, ...]
+
+
+def _to_turn(raw: dict) -> Turn:
+    expected = tuple(raw.get("expected_keywords", ()))
+    forbidden = tuple(raw.get("should_not_contain", ()))
+    return Turn(
+        query=raw["query"],
+        expected=expected,
+        expected_lc=tuple(k.lower() for k in expected),
+        forbidden=forbidden,
+        forbidden_lc=tuple(k.lower() for k in forbidden),
+        flags=sum(bit for key, bit in _FLAG_KEYS if raw.get(key)),
+    )
+
+
+SCENARIOS = tuple(
+    Scenario(s["name"], s["description"], tuple(_to_turn(t) for t in s["turns"]))
+    for s in CONVERSATION_SCENARIOS
+)
+
+
+# Pure greetings/acknowledgements carry no context worth replaying
+_GREETING_RE = re.compile(r"(hi|hello|hey|thanks|thank you|ok|okay|great|cool)( there)?[\s!?.,]*", re.IGNORECASE)
+
+
+def _entropy_ok(turn: Turn, response: str) -> bool:
+    """Return False for low-signal turns that would only pad the conversation context"""
+    if turn.flags & NO_TOOL:
+        return False
+    query = turn.query.strip()
+    if len(query.split()) < 3 or len(response.split()) < 5:
+        return False
+    return not _GREETING_RE.fullmatch(query)
+
+
+# Transient failures worth retrying; anything else fails the scenario
+_RECOVERABLE_ERRORS = (TimeoutError, ConnectionError) + ((httpx.TransportError,) if httpx else ())
+_RETRY_DELAYS = (1, 2, 4)
+
+
+async def _retry_with_backoff(bot: "HrBot", session_id: str, query: str) -> str:
+    """Retry a turn after a transient error, re-raising once the retries are used up"""
+    for attempt, delay in enumerate(_RETRY_DELAYS, 1):
+        await asyncio.sleep(delay)
+        try:
+            return await bot.acontinue_session(session_id, query)
+        except _RECOVERABLE_ERRORS:
+            if attempt == len(_RETRY_DELAYS):
+                raise
+
+
+def _snapshot_key(scenario_name: str, turn_num: int, query: str) -> str:
+    """Stable key for a recorded turn (the session context is implied by scenario and position)"""
+    return hashlib.sha256(f"{scenario_name}\x00{turn_num}\x00{query}".encode("utf-8")).hexdigest()
+
+
+# Horizontal rules, built once instead of on every header/turn
+_SEP50 = "─" * 50
+_RULES70 = {char: char * 70 for char in ("=", "═", "─")}
+
+
+def print_header(text: str, char: str = "=", out=None):
     """Print a formatted header"""
-    print(f"\n{char * 70}")
-    print(f"  {text}")
-    print(f"{char * 70}\n")
+    rule = _RULES70.get(char) or char * 70
+    (out or sys.stdout).write(f"\n{rule}\n  {text}\n{rule}\n\n")
 
 
-def print_result(passed: bool, message: str):
+def print_result(passed: bool, message: str, out=None):
     """Print test result with color"""
     status = "✅ PASS" if passed else "❌ FAIL"
-    print(f"  {status}: {message}")
+    (out or sys.stdout).write(f"  {status}: {message}\n")
+
+
+def _compile_keywords(keywords) -> re.Pattern:
+    """Compile a keyword list into one case-insensitive alternation, longest first"""
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered), re.IGNORECASE)
+
+
+# One compiled alternation per keyword list used by the scenarios
+_KW_PATTERNS = {
+    tuple(keywords): _compile_keywords(keywords)
+    for scenario in SCENARIOS
+    for turn in scenario.turns
+    for keywords in (turn.expected, turn.forbidden)
+    if keywords
+}
+
+
+def _build_automaton():
+    """Build one Aho-Corasick automaton over every scenario keyword"""
+    automaton = ahocorasick.Automaton()
+    for keywords in _KW_PATTERNS:
+        for keyword in keywords:
+            automaton.add_word(keyword.lower(), keyword.lower())
+    automaton.make_automaton()
+    return automaton
+
+
+_AC = _build_automaton() if ahocorasick else None
+_AC_KEYS = frozenset(_KW_PATTERNS) if _AC else frozenset()
 
 
-def check_keywords(response: str, expected: list, check_type: str = "contains") -> tuple[bool, list]:
-    """Check if response contains expected keywords"""
-    response_lower = response.lower()
+@lru_cache(maxsize=1)
+def _ac_hits(response: str) -> frozenset:
+    """All scenario keywords present in a response, found in a single pass"""
+    return frozenset(value for _, value in _AC.iter(response.lower()))
+
+
+def check_keywords(
+    response: str,
+    expected: list,
+    check_type: str = "contains",
+    expected_lc: tuple | None = None,
+) -> tuple[bool, list]:
+    """Check if response contains expected keywords (``expected_lc`` skips re-lowercasing them)"""
+    key = tuple(expected)
+    pairs = zip(expected, expected_lc or [k.lower() for k in expected])
+    if key in _AC_KEYS:
+        # Both checks of a turn share the same scan of the response
+        hits = _ac_hits(response)
+        found = []
+        missing = []
+        for keyword, keyword_lower in pairs:
+            (found if keyword_lower in hits else missing).append(keyword)
+        if check_type == "contains":
+            return len(missing) == 0, missing
+        return len(found) == 0, found
+
+    pattern = _KW_PATTERNS.get(key)
+    if pattern is None:
+        pattern = _KW_PATTERNS[key] = _compile_keywords(expected)
+    hits = {m.group(0).lower() for m in pattern.finditer(response)}
+
+    response_lower = None
     found = []
     missing = []
-    
-    for keyword in expected:
-        if keyword.lower() in response_lower:
-            found.append(keyword)
-        else:
-            missing.append(keyword)
+    for keyword, keyword_lower in pairs:
+        if keyword_lower not in hits:
+            # A longer keyword can shadow this one at the same offset; confirm directly
+            if response_lower is None:
+                response_lower = response.lower()
+            if keyword_lower not in response_lower:
+                missing.append(keyword)
+                continue
+        found.append(keyword)
     
     if check_type == "contains":
         return len(missing) == 0, missing
@@ -154,83 +328,102 @@ def check_keywords(response: str, expected: list, check_type: str = "contains")
         return len(found) == 0, found
 
 
-def run_conversation_test(scenario: dict, bot: HrBot) -> dict:
-    """Run a single conversation scenario"""
-    print_header(f"SCENARIO: {scenario['name']}", "─")
-    print(f"📝 {scenario['description']}\n")
+async def run_conversation_test(
+    scenario: Scenario,
+    bot: "HrBot",
+    snapshot: dict | None = None,
+    replay: bool = False,
+    fail_fast: bool = False,
+) -> dict:
+    """Run a single conversation scenario (turns stay sequential; scenarios may run concurrently)
+
+    With ``replay`` set, responses recorded in ``snapshot`` are used instead of calling the bot;
+    otherwise every response is written into ``snapshot`` when one is given. With ``fail_fast``
+    the remaining turns are skipped once a turn fails.
+    """
+    # Buffer this scenario's output and emit it in one write, so concurrent
+    # scenarios don't interleave and each line isn't a separate syscall
+    out = io.StringIO()
+    print_header(f"SCENARIO: {scenario.name}", "─", out)
+    out.write(f"📝 {scenario.description}\n\n")
     
     results = {
-        "name": scenario["name"],
+        "name": scenario.name,
         "turns": [],
         "passed": True
     }
     
-    conversation_history = []
+    # Only the most recent turns are ever consulted for follow-up hints
+    conversation_history = deque(maxlen=3)
+    session_id = bot.start_session()
     
-    for turn_num, turn in enumerate(scenario["turns"], 1):
-        print(f"\n{'─' * 50}")
-        print(f"  TURN {turn_num}: {turn['query'][:60]}...")
-        print(f"{'─' * 50}")
-        
-        # Build context from previous turns
-        context = ""
-        if conversation_history:
-            context_parts = []
-            for prev in conversation_history[-3:]:  # Last 3 turns for context
-                context_parts.append(f"User: {prev['query'][:100]}")
-                context_parts.append(f"Assistant: {prev['response'][:200]}...")
-            context = "\n".join(context_parts)
-        
-        # Run the query
-        try:
+    # One guard for the whole scenario: later turns depend on earlier ones, so an
+    # unexpected error ends the scenario; transient errors are retried per turn
+    turn = None
+    try:
+        for turn_num, turn in enumerate(scenario.turns, 1):
+            out.write(f"\n{_SEP50}\n  TURN {turn_num}: {turn.query[:60]}...\n{_SEP50}\n")
+            
             # Include context hint for follow-up questions
-            query = turn["query"]
-            if turn.get("context_aware") and conversation_history:
+            query = turn.query
+            if turn.flags & CTX_AWARE and conversation_history:
                 # The bot should infer context, but we can hint it
                 last_topic = conversation_history[-1].get("topic", "")
                 if last_topic:
                     query = f"(Regarding {last_topic}) {query}"
             
-            response = bot.query_with_cache(query, context=context)
+            snapshot_key = _snapshot_key(scenario.name, turn_num, query)
+            response = snapshot.get(snapshot_key) if replay and snapshot else None
+            if response is None:
+                # Greetings/capability checks go through the retrieval-free gate
+                response = bot.quick_reply(query) if turn.flags & NO_TOOL else None
+            if response is None:
+                try:
+                    response = await bot.acontinue_session(session_id, query)
+                except _RECOVERABLE_ERRORS:
+                    response = await _retry_with_backoff(bot, session_id, query)
+            if snapshot is not None and not replay:
+                snapshot[snapshot_key] = response
             
-            print(f"\n📤 Query: {turn['query']}")
-            print(f"\n📥 Response ({len(response)} chars):")
-            print(f"   {response[:500]}{'...' if len(response) > 500 else ''}")
+            ellipsis = "..." if len(response) > 500 else ""
+            out.write(
+                f"\n📤 Query: {turn.query}\n\n📥 Response ({len(response)} chars):\n   {response[:500]}{ellipsis}\n"
+            )
             
             turn_result = {
-                "query": turn["query"],
+                "query": turn.query,
                 "response": response,
                 "checks": []
             }
             
             # Check expected keywords
-            if "expected_keywords" in turn:
-                passed, missing = check_keywords(response, turn["expected_keywords"])
+            if turn.expected:
+                passed, missing = check_keywords(response, turn.expected, "contains", turn.expected_lc)
                 turn_result["checks"].append({
                     "type": "expected_keywords",
                     "passed": passed,
                     "details": f"Missing: {missing}" if missing else "All found"
                 })
-                print_result(passed, f"Expected keywords: {turn['expected_keywords'][:5]}...")
+                print_result(passed, f"Expected keywords: {list(turn.expected[:5])}...", out)
                 if not passed:
-                    print(f"      Missing: {missing}")
+                    print(f"      Missing: {missing}", file=out)
                     results["passed"] = False
             
             # Check should_not_contain (hallucination check)
-            if "should_not_contain" in turn:
-                passed, found = check_keywords(response, turn["should_not_contain"], "not_contains")
+            if turn.forbidden:
+                passed, found = check_keywords(response, turn.forbidden, "not_contains", turn.forbidden_lc)
                 turn_result["checks"].append({
                     "type": "no_hallucination",
                     "passed": passed,
                     "details": f"Found forbidden: {found}" if found else "Clean"
                 })
-                print_result(passed, f"No hallucination check: {turn['should_not_contain']}")
+                print_result(passed, f"No hallucination check: {list(turn.forbidden)}", out)
                 if not passed:
-                    print(f"      Found forbidden content: {found}")
+                    print(f"      Found forbidden content: {found}", file=out)
                     results["passed"] = False
             
             # Check no sources for non-tool queries
-            if turn.get("no_tool_needed"):
+            if turn.flags & NO_TOOL:
                 has_sources = "Sources:" in response or ".docx" in response
                 passed = not has_sources
                 turn_result["checks"].append({
@@ -238,38 +431,77 @@ def run_conversation_test(scenario: dict, bot: HrBot) -> dict:
                     "passed": passed,
                     "details": "No sources in greeting/capability response" if passed else "Incorrectly included sources"
                 })
-                print_result(passed, "No sources for greeting/capability query")
+                print_result(passed, "No sources for greeting/capability query", out)
                 if not passed:
                     results["passed"] = False
             
-            # Store for context
-            conversation_history.append({
-                "query": turn["query"],
-                "response": response,
-                "topic": turn.get("topic", turn["query"].split()[0:3])
-            })
+            # Store for context (greetings and acks are not worth remembering)
+            if _entropy_ok(turn, response):
+                conversation_history.append({
+                    "query": turn.query,
+                    "response": response,
+                    "topic": turn.query.split()[0:3]
+                })
             
             turn_result["passed"] = all(c["passed"] for c in turn_result["checks"])
             results["turns"].append(turn_result)
-            
-        except Exception as e:
-            print(f"\n❌ ERROR: {e}")
-            results["turns"].append({
-                "query": turn["query"],
-                "error": str(e),
-                "passed": False
-            })
-            results["passed"] = False
+            if fail_fast and not turn_result["passed"]:
+                out.write("\n⏭️  Fail-fast: skipping remaining turns\n")
+                break
+    
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}", file=out)
+        results["turns"].append({
+            "query": turn.query if turn else "",
+            "error": str(e),
+            "passed": False
+        })
+        results["passed"] = False
+    finally:
+        bot.end_session(session_id)
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
     
     return results
 
 
-def main():
+async def _run_scenarios(bots: list, snapshot: dict | None, replay: bool, fail_fast: bool) -> list:
+    """Run every scenario concurrently on its own bot; failures are returned in place of results"""
+    return await asyncio.gather(
+        *(run_conversation_test(scenario, bot, snapshot, replay, fail_fast) for scenario, bot in zip(SCENARIOS, bots)),
+        return_exceptions=True,
+    )
+
+
+def main(argv: list | None = None):
     """Run all conversation tests"""
+    # Imported here so the scenarios can be used as data without loading the bot stack
+    sys.path.insert(0, str(project_root / "src"))
+    from hr_bot.crew import HrBot
+
+    parser = argparse.ArgumentParser(description="Multi-turn conversation tests for the HR Bot")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", action="store_true", help=f"save every response to {SNAPSHOT_PATH}")
+    mode.add_argument("--replay", action="store_true", help="answer recorded turns from the snapshot (CI mode)")
+    parser.add_argument("--fail-fast", action="store_true", help="stop a scenario at its first failing turn")
+    args = parser.parse_args(argv)
+
+    snapshot = None
+    if args.record:
+        snapshot = {}
+    elif args.replay:
+        try:
+            snapshot = json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            print(f"⚠️  No snapshot at {SNAPSHOT_PATH}; every turn will run live")
+            snapshot = {}
+
     print_header("HR BOT CONTINUOUS CONVERSATION TEST", "═")
     print("Testing multi-turn conversations, follow-ups, and context retention\n")
     
-    # Initialize bot once
+    # Initialize the first bot; it builds or loads the indexes
     print("🔧 Initializing HR Bot...")
     try:
         bot = HrBot(user_role="employee", use_s3=True)
@@ -280,28 +512,44 @@ def main():
         traceback.print_exc()
         return 1
     
-    # Clear response cache for fresh tests
-    print("🧹 Clearing response cache for fresh tests...")
+    # Clear response cache for fresh tests (replayed turns never reach the cache)
+    if not args.replay:
+        print("🧹 Clearing response cache for fresh tests...")
+        try:
+            bot.response_cache.clear_all()
+            print("✅ Cache cleared\n")
+        except Exception as e:
+            print(f"⚠️  Could not clear cache: {e}")
+    
+    # One bot per scenario: concurrent kickoffs on a shared HrBot would share its
+    # agents, the tools' last sources and the usage counters
     try:
-        bot.response_cache.clear_all()
-        print("✅ Cache cleared\n")
+        bots = [bot] + [HrBot(user_role="employee", use_s3=True) for _ in SCENARIOS[1:]]
     except Exception as e:
-        print(f"⚠️  Could not clear cache: {e}")
+        print(f"❌ Failed to initialize bot: {e}")
+        return 1
     
-    # Run all scenarios
+    # Run all scenarios concurrently so their LLM round-trips overlap
     all_results = []
+    outcomes = asyncio.run(_run_scenarios(bots, snapshot, args.replay, args.fail_fast))
     
-    for scenario in CONVERSATION_SCENARIOS:
-        try:
-            result = run_conversation_test(scenario, bot)
-            all_results.append(result)
-        except Exception as e:
-            print(f"\n❌ Scenario failed with error: {e}")
+    if args.record:
+        SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        SNAPSHOT_PATH.write_text(json.dumps(snapshot, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Recorded {len(snapshot)} responses to {SNAPSHOT_PATH}")
+    
+    for scenario, outcome in zip(SCENARIOS, outcomes):
+        if isinstance(outcome, (KeyboardInterrupt, SystemExit)):
+            raise outcome
+        if isinstance(outcome, BaseException):
+            print(f"\n❌ Scenario failed with error: {outcome}")
             all_results.append({
-                "name": scenario["name"],
-                "error": str(e),
+                "name": scenario.name,
+                "error": str(outcome),
                 "passed": False
             })
+        else:
+            all_results.append(outcome)
     
     # Summary
     print_header("TEST SUMMARY", "═")
@@ -319,9 +567,7 @@ def main():
                 turn_status = "✓" if turn.get("passed") else "✗"
                 print(f"      Turn {i}: {turn_status}")
     
-    print(f"\n{'─' * 50}")
-    print(f"  TOTAL: {passed_scenarios}/{total_scenarios} scenarios passed")
-    print(f"{'─' * 50}")
+    sys.stdout.write(f"\n{_SEP50}\n  TOTAL: {passed_scenarios}/{total_scenarios} scenarios passed\n{_SEP50}\n")
     
     # Overall result
     if passed_scenarios == total_scenarios:
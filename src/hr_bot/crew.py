@@ -11,6 +11,7 @@ from crewai.memory.long_term.long_term_memory_item import LongTermMemoryItem
 from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
 from typing import List, Optional
 from contextlib import contextmanager
+import asyncio
 import hashlib
 import json
 import os
@@ -18,6 +19,7 @@ import re
 import sqlite3
 import threading
 import time
+import uuid
 from datetime import datetime
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
@@ -29,6 +31,11 @@ from hr_bot.tools.hybrid_rag_tool import HybridRAGTool
 from hr_bot.tools.master_actions_tool import MasterActionsTool
 from hr_bot.utils.cache import ResponseCache
 
+# "What can you help me with?" style questions, matched against normalized queries
+_CAPABILITY_RE = re.compile(
+    r"(what can you (do|help( me)? with)|what do you do|how can you help( me)?)( for me)?\??"
+)
+
 
 def remove_document_evidence_section(response: str) -> str:
     """
@@ -194,6 +201,12 @@ class HrBot():
     # Class-level cache for RAG tools (shared across instances)
     # This avoids rebuilding embeddings/indexes for the same role
     _rag_tool_cache = {}
+
+    # Conversation sessions replay their last SESSION_RECENT_TURNS turns verbatim; once
+    # SESSION_SUMMARIZE_AFTER turns pile up, the older ones are folded into a summary
+    SESSION_RECENT_TURNS = 2
+    SESSION_SUMMARIZE_AFTER = 5
+    SESSION_SUMMARY_TOPICS = 8
     
     def __init__(self, user_role: str = "employee", use_s3: bool = True):
         """
@@ -361,6 +374,10 @@ class HrBot():
             similarity_threshold=cache_similarity
         )
         print(f"✅ Semantic caching enabled (TTL: {cache_ttl_hours}h, Similarity: {cache_similarity:.0%})")
+
+        # Conversation sessions: session_id -> pre-formatted recent turns
+        self._sessions: dict = {}
+        self._sessions_lock = threading.Lock()
     
     @contextmanager
     def _get_db_connection(self):
@@ -436,19 +453,17 @@ class HrBot():
         else:
             print("📋 POLICY QUESTION DETECTED - Proceeding with HR document search for serious concern")
         
+        # Greetings and capability questions never need retrieval or the cache
+        quick_response = self.quick_reply(raw_query, context)
+        if quick_response:
+            print("💬 SMALL TALK - Skipping retrieval for conversational pleasantries.")
+            return quick_response
+
         # Check cache first
         cached_response = self.response_cache.get(raw_query, context)
         if cached_response:
             print("⚡ CACHE HIT - Returning instant response!")
             return cached_response
-        
-        small_talk_response = self._small_talk_response(raw_query, context)
-        if small_talk_response:
-            print("💬 SMALL TALK - Skipping retrieval for conversational pleasantries.")
-            # CRITICAL: Apply source filtering to small talk responses too
-            formatted_small_talk = remove_document_evidence_section(small_talk_response)
-            self.response_cache.set(raw_query, formatted_small_talk, context)
-            return formatted_small_talk
 
         # Cache miss - execute crew with full memory and retry logic
         print("🔄 CACHE MISS - Executing crew...")
@@ -537,10 +552,102 @@ class HrBot():
         
         return response_text
     
+    def start_session(self) -> str:
+        """
+        Open a conversation session whose recent turns are kept server-side.
+
+        Returns:
+            Session id to pass to continue_session()
+        """
+        session_id = uuid.uuid4().hex
+        with self._sessions_lock:
+            self._sessions[session_id] = {"summary": "", "topics": [], "turns": []}
+        return session_id
+
+    def continue_session(self, session_id: str, query: str) -> str:
+        """
+        Answer the next query of a session, using its previous turns as context.
+
+        Each turn is formatted once when it is recorded, so the context is not
+        rebuilt from the full history on every call. Small-talk turns are not
+        recorded, and older turns are folded into a summary, so the context stays
+        bounded however long the conversation runs.
+
+        Args:
+            session_id: Id returned by start_session()
+            query: User's question
+
+        Returns:
+            Formatted response string
+        """
+        with self._sessions_lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown session: {session_id}")
+
+        turns = session["turns"]
+        context_parts = [session["summary"]] if session["summary"] else []
+        context_parts.extend(turn["formatted"] for turn in turns)
+        response = self.query_with_cache(query, context="\n".join(context_parts))
+
+        # Small talk adds nothing to later answers, so keep it out of the context
+        if self.quick_reply(query) is None:
+            turns.append({
+                "query": query,
+                "response": response,
+                "formatted": f"User: {query[:100]}\nAssistant: {response[:200]}...",
+            })
+            if len(turns) >= self.SESSION_SUMMARIZE_AFTER:
+                folded = turns[:-self.SESSION_RECENT_TURNS]
+                del turns[:-self.SESSION_RECENT_TURNS]
+                session["topics"] = (session["topics"] + [t["query"] for t in folded])[-self.SESSION_SUMMARY_TOPICS:]
+                session["summary"] = self.summarize_history([{"query": q} for q in session["topics"]])
+        return response
+
+    def summarize_history(self, history: List[dict]) -> str:
+        """
+        Condense earlier conversation turns into a one-line context summary.
+
+        The summary lists the questions the user asked, which is what follow-ups
+        refer back to; it is built locally so folding history costs no LLM call.
+
+        Args:
+            history: Turns as dicts with at least a "query" key
+
+        Returns:
+            Summary string (empty when there is no history)
+        """
+        topics = [" ".join(turn["query"].split())[:80] for turn in history if turn.get("query")]
+        if not topics:
+            return ""
+        return "Earlier in this conversation the user asked about: " + "; ".join(topics)
+
+    async def acontinue_session(self, session_id: str, query: str) -> str:
+        """Async variant of continue_session(); the blocking crew call runs in a worker thread."""
+        return await asyncio.to_thread(self.continue_session, session_id, query)
+
+    def end_session(self, session_id: str) -> None:
+        """Drop the stored turns of a session."""
+        with self._sessions_lock:
+            self._sessions.pop(session_id, None)
+
     def get_cache_stats(self) -> dict:
         """Get cache performance statistics"""
         return self.response_cache.get_stats()
 
+    def quick_reply(self, query: str, context: str = "") -> Optional[str]:
+        """
+        Answer greetings, thanks, farewells and capability questions without retrieval.
+
+        Returns:
+            Canned response, or None when the query needs the full crew
+        """
+        small_talk_response = self._small_talk_response(query, context)
+        if small_talk_response:
+            # CRITICAL: Apply source filtering to small talk responses too
+            return remove_document_evidence_section(small_talk_response)
+        return None
+
     def _small_talk_response(self, query: str, context: str) -> Optional[str]:
         """Return tailored responses for greetings, farewells, and similar small-talk."""
         normalized = self._normalize_small_talk(query)
@@ -589,7 +696,7 @@ class HrBot():
         }
 
         identity_key = normalized.rstrip("?")
-        if identity_key in identity:
+        if identity_key in identity or _CAPABILITY_RE.fullmatch(identity_key):
             return (
                 "I'm Inara, your AI assistant! I can help you with document-based questions using our knowledge base, or answer general knowledge questions directly. How can I help you today?"
             )
@@ -3,7 +3,9 @@ Production-grade Hybrid RAG Tool with BM25 + Vector Search
 Optimized for tables and low-latency retrieval using Gemini embeddings
 """
 import os
+import json
 import pickle
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
@@ -373,7 +375,10 @@ class HybridRAGRetriever:
                         'documents': clean_documents,  # Use cleaned documents
                         'index_hash': self.index_hash
                     }, f)
-                    
+            
+            # Only a complete index gets a stats sentinel
+            if self.vector_store and self.bm25:
+                self._write_index_meta()
             print("✓ Indexes saved to disk")
         except (pickle.PicklingError, TypeError, AttributeError) as e:
             # If pickling fails (e.g., SearchResult serialization), just skip saving
@@ -382,6 +387,31 @@ class HybridRAGRetriever:
         except Exception as e:
             print(f"Warning: Could not save indexes: {e}")
     
+    def _write_index_meta(self):
+        """
+        Record file count, total size and build time in .rag_index/.meta.json.
+        
+        The admin console reads this instead of walking the index on every stats
+        request. Written via a temp file and rename so readers never see half of it.
+        """
+        file_count = 0
+        total_size = 0
+        for root, _dirs, files in os.walk(self.vector_store_dir):
+            for name in files:
+                if name.startswith(".meta.json"):
+                    continue
+                try:
+                    total_size += os.stat(os.path.join(root, name)).st_size
+                except OSError:
+                    continue
+                file_count += 1
+        
+        meta_path = self.vector_store_dir / ".meta.json"
+        tmp_path = self.vector_store_dir / ".meta.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"file_count": file_count, "total_size": total_size, "built_at": time.time()}, f)
+        os.replace(tmp_path, meta_path)
+    
     def _load_index(self, vector_store_path: Path, bm25_path: Path, current_hash: str) -> bool:
         """Load indexes from disk if available and valid"""
         try:
@@ -390,7 +420,6 @@ class HybridRAGRetriever:
                 return False
             
             # CRITICAL FIX: Check index age (24 hour TTL)
-            import time
             index_age_hours = (time.time() - bm25_path.stat().st_mtime) / 3600
             INDEX_TTL_HOURS = 24
             if index_age_hours > INDEX_TTL_HOURS:
@@ -492,6 +521,10 @@ class HybridRAGRetriever:
             if self._load_index(vector_store_path, bm25_path, current_hash):
                 return
         
+        # The old index is gone or stale: drop its stats sentinel so a failed or
+        # interrupted rebuild does not keep reporting the old totals
+        (self.vector_store_dir / ".meta.json").unlink(missing_ok=True)
+        
         print("Building new search index...")
         
         # Load and process documents (S3 mode or local mode)
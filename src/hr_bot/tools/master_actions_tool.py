@@ -4,26 +4,559 @@ Handles queries about HOW TO perform actions in HR systems (DarwinBox, SumTotal,
 Dynamically loads and indexes Master Document from S3 using same RAG approach as HybridRAGTool
 """
 import os
-import pickle
+import json
 import hashlib
+import mmap
 import re
+import shutil
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
+from importlib.util import find_spec
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_community.retrievers import BM25Retriever
-from langchain.retrievers import EnsembleRetriever
 from langchain.schema import Document
-from langchain_community.document_loaders import Docx2txtLoader
-from rank_bm25 import BM25Okapi
+from langchain_core.embeddings import Embeddings
 from diskcache import Cache
+import faiss
+import numpy as np
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+# torch/sentence-transformers, onnxruntime/transformers, python-docx and the LangChain
+# text splitter are imported where they are first used, so importing
+# this module (and starting the app) does not pay for them until the tool is used.
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Directory holding an int8-quantized ONNX export of EMBEDDING_MODEL (see quantize_embedding_model)
+ONNX_MODEL_DIR = os.getenv("MASTER_ACTIONS_ONNX_MODEL_DIR", "")
+ONNX_MODEL_FILE = "model_quantized.onnx"
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    MiniLM sentence embeddings served by ONNX Runtime from an int8-quantized export.
+
+    Mean-pools the last hidden state over the attention mask and L2-normalizes,
+    matching sentence-transformers' output for all-MiniLM-L6-v2.
+    """
+
+    def __init__(self, model_dir: str, model_name: str = EMBEDDING_MODEL, batch_size: int = 64, max_length: int = 256):
+        # Distinct name so int8 vectors never mix with FP32 ones in the embedding cache
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        
+        self.model_name = f"{model_name}:onnx-int8"
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            str(Path(model_dir) / ONNX_MODEL_FILE), providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+            hidden = self.session.run(None, feeds)[0]
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+        return np.vstack(batches) if batches else np.empty((0, 384), dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def quantize_embedding_model(output_dir: str, model_name: str = EMBEDDING_MODEL):
+    """
+    One-off export of the embedding model to ONNX with dynamic int8 quantization.
+
+    Requires optimum[onnxruntime]; point MASTER_ACTIONS_ONNX_MODEL_DIR at output_dir afterwards.
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    quantizer = ORTQuantizer.from_pretrained(output_dir)
+    quantizer.quantize(
+        save_dir=output_dir,
+        quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False),
+    )
+
+
+def _onnx_configured() -> bool:
+    return bool(ONNX_MODEL_DIR) and (Path(ONNX_MODEL_DIR) / ONNX_MODEL_FILE).exists() and find_spec("onnxruntime") is not None
+
+
+def _make_embeddings() -> Embeddings:
+    """ONNX int8 embeddings when an exported model is configured, else HuggingFaceEmbeddings"""
+    if _onnx_configured():
+        try:
+            return OnnxEmbeddings(ONNX_MODEL_DIR)
+        except Exception as e:
+            print(f"⚠️  ONNX embeddings unavailable ({e}) - using HuggingFaceEmbeddings")
+    from langchain_huggingface import HuggingFaceEmbeddings
+    
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs={'device': 'cpu', 'trust_remote_code': False},
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': 64}
+    )
+
+
+class LazyEmbeddings(Embeddings):
+    """
+    Embeddings proxy that builds the real model on first use.
+
+    Loading an index from disk only needs the model name, so the model download
+    and torch/onnxruntime start-up are deferred to the first embed call.
+    """
+
+    def __init__(self):
+        self._model: Optional[Embeddings] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> Embeddings:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = _make_embeddings()
+        return self._model
+
+    @property
+    def model_name(self) -> str:
+        # The ONNX backend can still fall back to HuggingFace while loading, so
+        # only the default backend's name is known without building the model
+        if self._model is None and not _onnx_configured():
+            return EMBEDDING_MODEL
+        return self.model.model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.model.embed_query(text)
+
+
+# HNSW graph parameters for the chunk index
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 64
+HNSW_EF_SEARCH = 32
+
+
+def _make_faiss_index(vectors: np.ndarray) -> "faiss.Index":
+    """
+    Build an inner-product HNSW index over L2-normalized vectors (IP == cosine).
+
+    Vectors are stored as 8-bit codes by a trained scalar quantizer: a quarter of
+    the memory of IndexHNSWFlat, at ~1% recall loss on normalized MiniLM vectors.
+    Search is O(log n). The graph is wrapped in an IndexIDMap2 whose ids are the
+    chunk_ids, so search hits index straight into the chunk list.
+    """
+    dim = vectors.shape[1]
+    hnsw = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    hnsw.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    hnsw.train(vectors)
+    index = faiss.IndexIDMap2(hnsw)
+    index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+    _set_ef_search(index)
+    return index
+
+
+def _set_ef_search(index: "faiss.Index"):
+    """Apply HNSW_EF_SEARCH to the HNSW graph inside an id-mapped index"""
+    faiss.downcast_index(index.index).hnsw.efSearch = HNSW_EF_SEARCH
+
+
+# Persisted indexes older than this are rebuilt
+INDEX_TTL_HOURS = 24
+
+# File-name keywords that identify the Master Document
+MASTER_DOC_KEYWORDS = ('knowledge', 'action', 'master', 'guide')
+PREFETCH_WORKERS = 4
+
+
+def _warm_page_cache(path: Path):
+    """Fault a file into the OS page cache so the later docx parse reads from memory"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        populate = getattr(mmap, 'MAP_POPULATE', None)
+        if populate is not None:
+            # Linux: the kernel reads the whole file in during mmap()
+            with mmap.mmap(f.fileno(), size, flags=mmap.MAP_SHARED | populate, prot=mmap.PROT_READ):
+                pass
+        else:
+            while f.read(1 << 20):
+                pass
+
+
+def _prefetch_documents(paths: List[Path]) -> List[Future]:
+    """Warm the page cache for candidate documents on a background pool"""
+    if not paths:
+        return []
+    pool = ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(paths)), thread_name_prefix="master-prefetch")
+    futures = [pool.submit(_warm_page_cache, path) for path in paths]
+    pool.shutdown(wait=False)
+    return futures
+
+
+def _iter_docx_paragraphs(path: Path) -> Iterator[str]:
+    """
+    Yield the text of every paragraph of a docx in document order.
+
+    Table cell paragraphs are included, like Docx2txt's output.
+    """
+    import docx
+    from docx.oxml.ns import qn
+    from docx.text.paragraph import Paragraph
+
+    document = docx.Document(str(path))
+    for element in document.element.body.iter(qn('w:p')):
+        yield Paragraph(element, document).text
+
+
+def _scan_mtimes(paths: Sequence[str]) -> Dict[str, float]:
+    """
+    mtime of each path, listing every parent directory once with os.scandir.
+
+    The document paths usually share one cache directory, so this costs one
+    directory read (DirEntry carries the stat on most platforms) instead of a
+    stat() per file. Missing paths are left out.
+    """
+    by_dir: Dict[str, Dict[str, str]] = {}
+    for path in paths:
+        by_dir.setdefault(os.path.dirname(path) or ".", {})[os.path.basename(path)] = path
+    
+    mtimes: Dict[str, float] = {}
+    for directory, names in by_dir.items():
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name in names:
+                        mtimes[names[entry.name]] = entry.stat().st_mtime
+        except OSError:
+            continue
+    return mtimes
+
+
+# Placeholder tokens in the Master Document, tried in order; the last group is the generic cleanup
+_PLACEHOLDER_RE = re.compile(
+    r"(\[insert name and job title\])"
+    r"|(\[insert job title\])"
+    r"|(\[the Company\])"
+    r"|(\[Company Name\])"
+    r"|(\[Employee\])"
+    r"|(\[INSERT LOGO HERE\])"
+    r"|(\[\s*insert[^\]]*\])",
+    re.IGNORECASE,
+)
+_PLACEHOLDER_REPLACEMENTS = (
+    "HR Representative",
+    "HR Representative",
+    "the company",
+    "the company",
+    "employee",
+    "",
+    "the appropriate details",
+)
+
+# Phrases that mark a chunk as procedural content; bit i of a chunk's marker mask is ACTION_MARKERS[i]
+ACTION_MARKERS = ('link:', 'steps:', 'step 1', 'step 2', 'click', 'navigate', 'select', 'action name:')
+
+
+def _marker_bits(content_lower: str) -> int:
+    """Bitmask of the ACTION_MARKERS present in lowercased chunk text"""
+    bits = 0
+    for i, marker in enumerate(ACTION_MARKERS):
+        if marker in content_lower:
+            bits |= 1 << i
+    return bits
+
+
+# Query words ignored by the keyword-match boost
+STOP_WORDS = frozenset({'a', 'an', 'the', 'is', 'are', 'to', 'for', 'of', 'in', 'on', 'how', 'what', 'i', 'my', 'can'})
+
+
+# Common action synonyms appended to queries mentioning the keyword
+ACTION_EXPANSIONS = {
+    'apply': ['request', 'submit', 'file'],
+    'download': ['get', 'access', 'view', 'fetch'],
+    'leave': ['vacation', 'time off', 'absence', 'pto'],
+    'payslip': ['salary slip', 'pay stub', 'salary statement'],
+    'profile': ['personal details', 'employee info', 'my details'],
+    'training': ['learning', 'course', 'certification', 'skill'],
+    'expense': ['reimbursement', 'claim', 'travel claim'],
+    'attendance': ['punch', 'check in', 'clock'],
+    'holiday': ['calendar', 'public holiday', 'company holiday'],
+    'form-16': ['tax form', 'income tax', 'tds'],
+    'balance': ['remaining', 'available', 'quota'],
+}
+# Keywords are plain substrings of the lowercased query, as with `keyword in q`
+_EXPANSION_RE = re.compile("|".join(map(re.escape, sorted(ACTION_EXPANSIONS, key=len, reverse=True))))
+
+
+# Reciprocal Rank Fusion constant (same default as LangChain's EnsembleRetriever)
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercased word tokens shared by BM25 indexing and querying"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Lucene-variant BM25 with every term/document score precomputed at index time.
+
+    Scores are stored term-major (one posting slice per term), so scoring a query
+    is a numpy gather + bincount over the query terms' postings instead of a
+    Python loop over the corpus.
+    """
+
+    def __init__(self, vocab: Dict[str, int], indptr: np.ndarray, doc_ids: np.ndarray, scores: np.ndarray, n_docs: int):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.scores = scores
+        self.n_docs = n_docs
+        # Best score each term contributes to any document: bounds a query's top score
+        self.term_max = (
+            np.maximum.reduceat(scores, indptr[:-1]) if len(scores) else np.zeros(0, dtype=np.float32)
+        )
+
+    @classmethod
+    def build(cls, tokenized_corpus: Sequence[Sequence[str]], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        n_docs = len(tokenized_corpus)
+        doc_len = np.fromiter((len(tokens) for tokens in tokenized_corpus), dtype=np.float32, count=n_docs)
+        avgdl = float(doc_len.mean()) if n_docs and doc_len.mean() > 0 else 1.0
+
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_id, tokens in enumerate(tokenized_corpus):
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocab: Dict[str, int] = {}
+        indptr = [0]
+        doc_ids: List[int] = []
+        tfs: List[int] = []
+        for term, plist in postings.items():
+            vocab[term] = len(vocab)
+            doc_ids.extend(d for d, _ in plist)
+            tfs.extend(tf for _, tf in plist)
+            indptr.append(len(doc_ids))
+
+        indptr_arr = np.asarray(indptr, dtype=np.int64)
+        doc_ids_arr = np.asarray(doc_ids, dtype=np.int32)
+        tf_arr = np.asarray(tfs, dtype=np.float32)
+        df = np.diff(indptr_arr).astype(np.float32)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        norm = k1 * (1.0 - b + b * doc_len[doc_ids_arr] / avgdl)
+        scores = (np.repeat(idf, np.diff(indptr_arr)) * tf_arr / (tf_arr + norm)).astype(np.float32)
+        return cls(vocab, indptr_arr, doc_ids_arr, scores, n_docs)
+
+    def save(self, directory: Path, **meta):
+        """Write the postings as bm25.npz plus vocab/extra metadata as meta.json"""
+        directory.mkdir(parents=True, exist_ok=True)
+        np.savez(directory / "bm25.npz", indptr=self.indptr, doc_ids=self.doc_ids, scores=self.scores)
+        terms = sorted(self.vocab, key=self.vocab.get)
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"n_docs": self.n_docs, "vocab": terms, **meta}, f)
+
+    @classmethod
+    def load(cls, directory: Path) -> Tuple["BM25Index", dict]:
+        """Inverse of save(); returns the index and the extra metadata"""
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(directory / "bm25.npz") as arrays:
+            indptr, doc_ids, scores = arrays["indptr"], arrays["doc_ids"], arrays["scores"]
+        vocab = {term: idx for idx, term in enumerate(meta.pop("vocab"))}
+        return cls(vocab, indptr, doc_ids, scores, meta.pop("n_docs")), meta
+
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """BM25 score of every document for the query"""
+        term_ids = [self.vocab[t] for t in query_tokens if t in self.vocab]
+        if not term_ids:
+            return np.zeros(self.n_docs, dtype=np.float32)
+        spans = [np.arange(self.indptr[t], self.indptr[t + 1]) for t in term_ids]
+        positions = np.concatenate(spans)
+        return np.bincount(
+            self.doc_ids[positions], weights=self.scores[positions], minlength=self.n_docs
+        ).astype(np.float32)
+
+    def max_score(self, query_tokens: Sequence[str]) -> float:
+        """Upper bound on any document's score for the query, without scoring"""
+        return float(sum(self.term_max[self.vocab[t]] for t in query_tokens if t in self.vocab))
+
+    def top_n(self, query_tokens: Sequence[str], n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and scores of the n best matching documents (score > 0), best first"""
+        scores = self.get_scores(query_tokens)
+        n = min(n, self.n_docs)
+        if n <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidates = np.argpartition(-scores, n - 1)[:n]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        candidates = candidates[scores[candidates] > 0]
+        return candidates, scores[candidates]
+
+
+class ChunkStore:
+    """
+    Chunk text and metadata in SQLite, keyed by chunk_id.
+
+    Behaves like a read-only list of Documents; rows are fetched on first access
+    and memoized, so a loaded index only materializes the chunks search() returns.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._rows: Dict[int, Document] = {}
+        with self._lock:
+            self._len = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    @staticmethod
+    def write(path: Path, documents: Sequence[Document]):
+        if path.exists():
+            path.unlink()
+        conn = sqlite3.connect(str(path))
+        try:
+            conn.execute("CREATE TABLE chunks (chunk_id INTEGER PRIMARY KEY, content TEXT, metadata TEXT)")
+            conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?)",
+                ((idx, doc.page_content, json.dumps(doc.metadata)) for idx, doc in enumerate(documents)),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, chunk_id: int) -> Document:
+        doc = self._rows.get(chunk_id)
+        if doc is None:
+            if not 0 <= chunk_id < self._len:
+                raise IndexError(chunk_id)
+            with self._lock:
+                content, metadata = self._conn.execute(
+                    "SELECT content, metadata FROM chunks WHERE chunk_id = ?", (chunk_id,)
+                ).fetchone()
+            doc = Document(page_content=content, metadata=json.loads(metadata))
+            self._rows[chunk_id] = doc
+        return doc
+
+    def __iter__(self):
+        return (self[idx] for idx in range(self._len))
+
+
+class LoweredChunks:
+    """Lowercased chunk text by chunk_id, computed on first access and memoized"""
+
+    def __init__(self, documents: Sequence[Document]):
+        self.documents = documents
+        self._lowered: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __getitem__(self, chunk_id: int) -> str:
+        text = self._lowered.get(chunk_id)
+        if text is None:
+            text = self._lowered[chunk_id] = self.documents[chunk_id].page_content.lower()
+        return text
+
+
+def _rrf_fuse(rankings: Sequence[Sequence[int]], weights: Sequence[float], k: int = RRF_K) -> List[int]:
+    """Weighted Reciprocal Rank Fusion of several ranked id lists, best first"""
+    fused: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(fused, key=fused.get, reverse=True)
+
+
+class SemanticSearchCache:
+    """
+    In-memory cache of search results keyed on the query embedding.
+
+    A 64-bit random-projection LSH index proposes the nearest cached queries; a
+    hit additionally needs cosine similarity above ``threshold`` against the
+    stored vector, so rephrasings of the same intent ("how to apply leave" vs
+    "apply for leave") share one retrieval.
+    """
+
+    def __init__(self, dim: int, nbits: int = 64, threshold: float = 0.95,
+                 ttl: float = 3600, max_entries: int = 1024, candidates: int = 4):
+        self.dim = dim
+        self.nbits = nbits
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.candidates = candidates
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._lsh = faiss.IndexLSH(self.dim, self.nbits)
+        self._vectors: List[np.ndarray] = []
+        self._entries: List[Tuple[int, float, list]] = []  # (top_k, stored_at, results)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def get(self, qvec: np.ndarray, top_k: int) -> Optional[list]:
+        with self._lock:
+            if not self._entries:
+                return None
+            _, ids = self._lsh.search(qvec.reshape(1, -1), min(self.candidates, len(self._entries)))
+            now = time.time()
+            for idx in ids[0]:
+                if idx < 0:
+                    continue
+                entry_k, stored_at, results = self._entries[idx]
+                if entry_k != top_k or now - stored_at > self.ttl:
+                    continue
+                if float(np.dot(self._vectors[idx], qvec)) >= self.threshold:
+                    return results
+        return None
+
+    def set(self, qvec: np.ndarray, top_k: int, results: list):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._reset()
+            self._lsh.add(qvec.reshape(1, -1))
+            self._vectors.append(qvec)
+            self._entries.append((top_k, time.time(), results))
+
 
 @dataclass
 class ActionSearchResult:
@@ -58,20 +591,23 @@ class MasterActionsRetriever:
             document_paths: Optional list of document file paths (for S3 documents)
             s3_version_hash: Optional S3 ETag-based version hash for cache invalidation
         """
-        # Use same embeddings as HybridRAGTool for consistency
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={'device': 'cpu', 'trust_remote_code': False},
-            encode_kwargs={'normalize_embeddings': True}
+        # Start pulling candidate Master Documents into the page cache so disk
+        # reads overlap with the embedding model load below
+        self._prefetch_futures = _prefetch_documents(
+            self._candidate_documents(cache_dir, document_paths)
         )
         
+        # Same model as HybridRAGTool for consistency (int8 ONNX build when configured);
+        # loaded on the first embed call
+        self.embeddings = LazyEmbeddings()
+        
         # Core indices
-        self.vector_store = None
-        self.bm25 = None
-        self.bm25_retriever = None
-        self.faiss_retriever = None
-        self.ensemble_retriever = None
-        self.documents: List[Document] = []
+        self.faiss_index: Optional["faiss.Index"] = None
+        self.bm25: Optional[BM25Index] = None
+        self.documents: Sequence[Document] = []
+        # Per-chunk features indexed by chunk_id, computed once per index build/load
+        self.content_lower: Sequence[str] = []
+        self.marker_mask = np.zeros(0, dtype=np.uint8)
         
         # Configuration
         self.cache_dir = cache_dir
@@ -82,19 +618,47 @@ class MasterActionsRetriever:
         self.index_dir = Path.home() / ".master_actions_index"
         self.index_dir.mkdir(exist_ok=True)
         self.index_hash: Optional[str] = None
+        self._index_built_at = 0.0
         
-        # Cache for search results
-        self._search_cache = Cache(str(self.index_dir / "search_cache"))
+        # In-process LRU of search results: (stored_at, results) by cache key
+        self._search_cache: "OrderedDict[str, Tuple[float, List[ActionSearchResult]]]" = OrderedDict()
+        self._search_cache_lock = threading.Lock()
+        # Chunk embeddings keyed by content hash, so rebuilds only embed changed chunks
+        self._embedding_cache = Cache(str(self.index_dir / "emb_cache"))
+        # Near-duplicate queries (by embedding) reuse each other's results
+        self._semantic_cache = SemanticSearchCache(dim=384)
+        # Runs the FAISS lookup alongside BM25 scoring in search()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="master-search")
         
         # Search settings (tuned for action/procedural content)
         self.chunk_size = 600  # Smaller chunks for action steps
         self.chunk_overlap = 150
         self.top_k = 5
+        self.search_cache_size = 512
+        self.search_cache_ttl = 3600
         self.bm25_weight = 0.6  # Higher BM25 weight for keyword matching (action names)
         self.vector_weight = 0.4
+        # A BM25 top hit scoring above this (and containing action steps) is returned
+        # without the embedding + FAISS pass
+        self.bm25_shortcut_threshold = float(os.getenv("MASTER_ACTIONS_BM25_SHORTCUT", "10.0"))
         
         self._last_sources: List[str] = []
     
+    @staticmethod
+    def _candidate_documents(cache_dir: Optional[str], document_paths: Optional[List[str]]) -> List[Path]:
+        """All docx files that _find_master_document might pick"""
+        candidates = []
+        for doc_path in document_paths or []:
+            p = Path(doc_path)
+            if any(kw in p.name.lower() for kw in MASTER_DOC_KEYWORDS) and p.is_file():
+                candidates.append(p)
+        if cache_dir and Path(cache_dir).is_dir():
+            candidates.extend(
+                file for file in Path(cache_dir).glob("*.docx")
+                if any(kw in file.name.lower() for kw in MASTER_DOC_KEYWORDS)
+            )
+        return candidates
+    
     def _find_master_document(self) -> Optional[Path]:
         """
         Find Master Document in cache directory or document paths
@@ -112,7 +676,7 @@ class MasterActionsRetriever:
         if self.document_paths:
             for doc_path in self.document_paths:
                 p = Path(doc_path)
-                if p.exists() and any(kw in p.name.lower() for kw in ['knowledge', 'action', 'master', 'guide']):
+                if p.exists() and any(kw in p.name.lower() for kw in MASTER_DOC_KEYWORDS):
                     return p
         
         # Search in cache directories
@@ -124,7 +688,7 @@ class MasterActionsRetriever:
             
             # Search for variations
             for file in base_path.glob("*.docx"):
-                if any(kw in file.name.lower() for kw in ['knowledge', 'action', 'master', 'guide']):
+                if any(kw in file.name.lower() for kw in MASTER_DOC_KEYWORDS):
                     return file
         
         # Fallback: check local data directory
@@ -134,7 +698,7 @@ class MasterActionsRetriever:
             local_master = project_root / "data" / "Master-Document"
             if local_master.exists():
                 for file in local_master.glob("*.docx"):
-                    if any(kw in file.name.lower() for kw in ['knowledge', 'action', 'master', 'guide']):
+                    if any(kw in file.name.lower() for kw in MASTER_DOC_KEYWORDS):
                         return file
         except Exception:
             pass
@@ -149,76 +713,62 @@ class MasterActionsRetriever:
         if self.s3_version_hash:
             hasher.update(self.s3_version_hash.encode())
         elif self.document_paths:
+            mtimes = _scan_mtimes(self.document_paths)
             for doc_path in sorted(self.document_paths):
                 hasher.update(doc_path.encode())
-                try:
-                    mtime = Path(doc_path).stat().st_mtime
-                    hasher.update(str(mtime).encode())
-                except Exception:
-                    pass
+                if doc_path in mtimes:
+                    hasher.update(str(mtimes[doc_path]).encode())
         
         # Include config in hash
         hasher.update(f"chunk:{self.chunk_size}|overlap:{self.chunk_overlap}".encode())
-        hasher.update(b"master_actions_v2")
+        hasher.update(f"embeddings:{self.embeddings.model_name}".encode())
+        hasher.update(b"master_actions_v5")
         
         return hasher.hexdigest()
     
     def _load_master_document(self) -> List[Document]:
-        """Load Master Document and return as Document objects"""
-        documents = []
-        
+        """Load Master Document and return it as chunked Document objects"""
         master_path = self._find_master_document()
         if not master_path:
             print("❌ Master Document not found in cache")
-            return documents
+            return []
         
         print(f"📖 Loading Master Document: {master_path.name}")
         
+        # Let any in-flight prefetch finish so the loader reads warm pages
+        wait(self._prefetch_futures)
+        self._prefetch_futures = []
+        
+        metadata = {
+            'source': master_path.name,
+            'file_path': str(master_path),
+            'type': 'master_actions',
+        }
         try:
-            loader = Docx2txtLoader(str(master_path))
-            docs = loader.load()
-            
-            for doc in docs:
-                doc.metadata['source'] = master_path.name
-                doc.metadata['file_path'] = str(master_path)
-                doc.metadata['type'] = 'master_actions'
-                
-                # Clean content
-                doc.page_content = self._sanitize_content(doc.page_content)
-                documents.append(doc)
-            
+            chunks = self._chunk_paragraphs(_iter_docx_paragraphs(master_path), metadata)
             print(f"✅ Loaded Master Document: {master_path.name}")
-            
+            return chunks
         except Exception as e:
             print(f"❌ Error loading Master Document: {e}")
-        
-        return documents
+            return []
     
     def _sanitize_content(self, text: str) -> str:
         """Clean placeholder tokens and normalize text"""
         if not text:
             return text
         
-        # Common placeholder replacements
-        replacements = {
-            r"\[insert name and job title\]": "HR Representative",
-            r"\[insert job title\]": "HR Representative",
-            r"\[the Company\]": "the company",
-            r"\[Company Name\]": "the company",
-            r"\[Employee\]": "employee",
-            r"\[INSERT LOGO HERE\]": "",
-        }
-        
-        for pattern, replacement in replacements.items():
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        # Generic placeholder cleanup
-        text = re.sub(r"\[\s*insert[^\]]*\]", "the appropriate details", text, flags=re.IGNORECASE)
-        
-        return text
+        # One pass over the text for every placeholder
+        return _PLACEHOLDER_RE.sub(lambda m: _PLACEHOLDER_REPLACEMENTS[m.lastindex - 1], text)
     
-    def _chunk_documents(self, documents: List[Document]) -> List[Document]:
-        """Chunk documents with action-aware splitting"""
+    def _chunk_paragraphs(self, paragraphs: Iterable[str], metadata: dict) -> List[Document]:
+        """
+        Chunk a paragraph stream with action-aware splitting.
+
+        Paragraphs are sanitized one at a time and split from a rolling buffer of a
+        few chunks, so the whole document never sits in memory as one string.
+        """
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        
         # Use separators that preserve action blocks
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.chunk_size,
@@ -226,37 +776,56 @@ class MasterActionsRetriever:
             separators=["\n\n\n", "\n\n", "Action Name:", "\n", ". ", " "],
             length_function=len,
         )
+        window = self.chunk_size * 8
+        
+        chunks: List[Document] = []
+        buffer: List[str] = []
+        buffered = 0
         
-        chunks = text_splitter.split_documents(documents)
+        def split_buffer(final: bool):
+            pieces = text_splitter.split_text("".join(buffer))
+            buffer.clear()
+            if not final and len(pieces) > 1:
+                # The last piece may continue in the next paragraphs: split it again later
+                carry = pieces.pop() + "\n\n"
+                buffer.append(carry)
+            for piece in pieces:
+                chunks.append(Document(page_content=piece, metadata={**metadata, 'chunk_id': len(chunks)}))
+            return sum(len(part) for part in buffer)
         
-        # Add chunk IDs
-        for idx, chunk in enumerate(chunks):
-            chunk.metadata['chunk_id'] = idx
+        for paragraph in paragraphs:
+            # Paragraph breaks as Docx2txt renders them
+            text = self._sanitize_content(paragraph) + "\n\n"
+            buffer.append(text)
+            buffered += len(text)
+            if buffered >= window:
+                buffered = split_buffer(final=False)
+        split_buffer(final=True)
         
         return chunks
     
+    def _index_chunk_features(self):
+        """Precompute lowercased content and action-marker bitmasks for every chunk"""
+        self.content_lower = LoweredChunks(self.documents)
+        self.marker_mask = np.fromiter(
+            (_marker_bits(self.content_lower[idx]) for idx in range(len(self.documents))),
+            dtype=np.uint8,
+            count=len(self.documents),
+        )
+    
     def _save_index(self, vector_path: Path, bm25_path: Path):
         """Save indexes to disk"""
         try:
-            if self.vector_store:
-                self.vector_store.save_local(str(vector_path))
+            if self.faiss_index is not None:
+                faiss.write_index(self.faiss_index, str(vector_path))
             
             if self.bm25:
-                # Clean documents before saving (remove non-picklable objects)
-                clean_docs = []
-                for doc in self.documents:
-                    clean_doc = Document(
-                        page_content=doc.page_content,
-                        metadata=doc.metadata.copy()
-                    )
-                    clean_docs.append(clean_doc)
-                
-                with open(bm25_path, 'wb') as f:
-                    pickle.dump({
-                        'bm25': self.bm25,
-                        'documents': clean_docs,
-                        'index_hash': self.index_hash
-                    }, f)
+                # BM25 postings + marker masks as numpy, chunks in SQLite; meta.json is
+                # written last so a half-written directory never validates
+                bm25_path.mkdir(parents=True, exist_ok=True)
+                np.save(bm25_path / "marker_mask.npy", self.marker_mask)
+                ChunkStore.write(bm25_path / "chunks.sqlite3", self.documents)
+                self.bm25.save(bm25_path, index_hash=self.index_hash, built_at=self._index_built_at)
             
             print("✓ Master Actions index saved")
         except Exception as e:
@@ -265,38 +834,34 @@ class MasterActionsRetriever:
     def _load_index(self, vector_path: Path, bm25_path: Path, current_hash: str) -> bool:
         """Load indexes from disk if valid"""
         try:
-            if not vector_path.exists() or not bm25_path.exists():
+            if not (bm25_path / "meta.json").exists():
                 return False
             
-            # Check TTL (24 hours)
-            import time
-            index_age_hours = (time.time() - bm25_path.stat().st_mtime) / 3600
-            if index_age_hours > 24:
+            bm25, meta = BM25Index.load(bm25_path)
+            
+            # Check TTL against the build time recorded in meta.json
+            built_at = meta.get('built_at', 0.0)
+            index_age_hours = (time.time() - built_at) / 3600
+            if index_age_hours > INDEX_TTL_HOURS:
                 print(f"⏰ Master Actions index is {index_age_hours:.1f}h old - rebuilding...")
                 return False
             
-            # Load and validate hash
-            with open(bm25_path, 'rb') as f:
-                data = pickle.load(f)
-            
-            if data.get('index_hash') != current_hash:
+            # Validate hash
+            if meta.get('index_hash') != current_hash:
                 print(f"🔄 Master Actions index hash mismatch - rebuilding...")
                 return False
             
-            # Load FAISS
-            self.vector_store = FAISS.load_local(
-                str(vector_path),
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
-            
-            # Load BM25 data
-            self.bm25 = data['bm25']
-            self.documents = data['documents']
-            self.index_hash = data['index_hash']
+            # Load BM25 data; chunk text stays on disk until a search returns it
+            self.bm25 = bm25
+            self.documents = ChunkStore(bm25_path / "chunks.sqlite3")
             
-            # Rebuild retrievers
-            self._build_retrievers()
+            # Load FAISS
+            self.faiss_index = faiss.read_index(str(vector_path))
+            _set_ef_search(self.faiss_index)
+            self.index_hash = meta['index_hash']
+            self._index_built_at = built_at
+            self.content_lower = LoweredChunks(self.documents)
+            self.marker_mask = np.load(bm25_path / "marker_mask.npy")
             
             print("✓ Loaded Master Actions index from disk")
             return True
@@ -305,40 +870,63 @@ class MasterActionsRetriever:
             print(f"Could not load Master Actions index: {e}")
             return False
     
-    def _build_retrievers(self):
-        """Build BM25 and FAISS retrievers after loading documents"""
-        if not self.documents:
-            return
-        
-        base_k = max(self.top_k, 5)
-        
-        self.faiss_retriever = self.vector_store.as_retriever(
-            search_kwargs={"k": base_k * 2}
-        )
-        
-        self.bm25_retriever = BM25Retriever.from_documents(self.documents)
-        self.bm25_retriever.k = base_k * 2
-        
-        self.ensemble_retriever = EnsembleRetriever(
-            retrievers=[self.bm25_retriever, self.faiss_retriever],
-            weights=[self.bm25_weight, self.vector_weight],
-        )
-    
+    def _embed_documents_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed chunk texts, reusing vectors from the on-disk embedding cache.
+
+        Keys are sha256(model name + chunk text); vectors are stored as FP16 bytes.
+        Only cache misses go through the embedding model.
+        """
+        model_name = self.embeddings.model_name
+        keys = [hashlib.sha256((model_name + text).encode("utf-8")).hexdigest() for text in texts]
+
+        vectors: List[Optional[np.ndarray]] = []
+        missing: List[int] = []
+        for idx, key in enumerate(keys):
+            blob = self._embedding_cache.get(key)
+            if blob is None:
+                vectors.append(None)
+                missing.append(idx)
+            else:
+                vectors.append(np.frombuffer(blob, dtype=np.float16).astype(np.float32))
+
+        if missing:
+            fresh = np.asarray(
+                self.embeddings.embed_documents([texts[idx] for idx in missing]),
+                dtype=np.float32,
+            )
+            for idx, vector in zip(missing, fresh):
+                vectors[idx] = vector
+                self._embedding_cache.set(keys[idx], vector.astype(np.float16).tobytes())
+
+        print(f"🧮 Embedded {len(missing)} new chunks ({len(texts) - len(missing)} from cache)")
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
     def build_index(self, force_rebuild: bool = False):
         """Build or load hybrid search index for Master Document"""
         current_hash = self._compute_version_hash()
         
-        vector_path = self.index_dir / "master_faiss_index"
-        bm25_path = self.index_dir / "master_bm25_index.pkl"
+        # Already serving this version and still within its TTL: nothing to touch on disk
+        if (
+            not force_rebuild
+            and self.faiss_index is not None
+            and self.index_hash == current_hash
+            and (time.time() - self._index_built_at) / 3600 <= INDEX_TTL_HOURS
+        ):
+            return
+        
+        self._semantic_cache.clear()
+        
+        vector_path = self.index_dir / "master_faiss.index"
+        bm25_path = self.index_dir / "master_bm25_index"
         
         # Force rebuild if requested
         if force_rebuild:
             print("🔥 Force rebuild Master Actions index")
-            import shutil
             if vector_path.exists():
-                shutil.rmtree(vector_path)
+                vector_path.unlink()
             if bm25_path.exists():
-                bm25_path.unlink()
+                shutil.rmtree(bm25_path)
         else:
             # Try to load existing index
             if self._load_index(vector_path, bm25_path, current_hash):
@@ -347,35 +935,31 @@ class MasterActionsRetriever:
         print("🔨 Building Master Actions index...")
         
         # Load and chunk Master Document
-        raw_docs = self._load_master_document()
-        if not raw_docs:
+        chunks = self._load_master_document()
+        if not chunks:
             print("⚠️  No Master Document found - tool will return NO_ACTION_FOUND")
             return
         
-        self.documents = self._chunk_documents(raw_docs)
+        self.documents = chunks
         print(f"📊 Created {len(self.documents)} chunks from Master Document")
         
         if not self.documents:
             return
         
-        # Build FAISS vector store
+        self._index_chunk_features()
+        
+        # Build FAISS index: embed the chunks (cache misses only, in one batched
+        # call) and add them under their chunk_ids
         texts = [doc.page_content for doc in self.documents]
-        metadatas = [doc.metadata for doc in self.documents]
+        vectors = self._embed_documents_cached(texts)
         
-        self.vector_store = FAISS.from_texts(
-            texts=texts,
-            embedding=self.embeddings,
-            metadatas=metadatas
-        )
+        self.faiss_index = _make_faiss_index(vectors)
         
         # Build BM25 index
-        tokenized_corpus = [doc.page_content.lower().split() for doc in self.documents]
-        self.bm25 = BM25Okapi(tokenized_corpus)
-        
-        # Build retrievers
-        self._build_retrievers()
+        self.bm25 = BM25Index.build([_tokenize(doc.page_content) for doc in self.documents])
         
         self.index_hash = current_hash
+        self._index_built_at = time.time()
         print(f"✅ Master Actions index built with {len(self.documents)} chunks")
         
         # Save index
@@ -384,31 +968,36 @@ class MasterActionsRetriever:
     def _expand_query(self, query: str) -> str:
         """Expand query with action-related synonyms for better recall"""
         q = query.strip().lower()
-        expansions = []
-        
-        # Common action synonyms
-        action_expansions = {
-            'apply': ['request', 'submit', 'file'],
-            'download': ['get', 'access', 'view', 'fetch'],
-            'leave': ['vacation', 'time off', 'absence', 'pto'],
-            'payslip': ['salary slip', 'pay stub', 'salary statement'],
-            'profile': ['personal details', 'employee info', 'my details'],
-            'training': ['learning', 'course', 'certification', 'skill'],
-            'expense': ['reimbursement', 'claim', 'travel claim'],
-            'attendance': ['punch', 'check in', 'clock'],
-            'holiday': ['calendar', 'public holiday', 'company holiday'],
-            'form-16': ['tax form', 'income tax', 'tds'],
-            'balance': ['remaining', 'available', 'quota'],
-        }
         
-        for keyword, synonyms in action_expansions.items():
-            if keyword in q:
-                expansions.extend(synonyms)
+        # One scan finds every keyword; synonyms are deduplicated in a fixed order so the expanded
+        # query (and therefore its cache key) is stable across processes
+        expansions: Dict[str, None] = {}
+        for keyword in dict.fromkeys(m.group() for m in _EXPANSION_RE.finditer(q)):
+            expansions.update(dict.fromkeys(ACTION_EXPANSIONS[keyword]))
         
         if expansions:
-            return f"{query} {' '.join(set(expansions))}"
+            return f"{query} {' '.join(expansions)}"
         return query
     
+    def _get_cached_search(self, cache_key: str) -> Optional[List[ActionSearchResult]]:
+        with self._search_cache_lock:
+            entry = self._search_cache.get(cache_key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.time() - stored_at > self.search_cache_ttl:
+                del self._search_cache[cache_key]
+                return None
+            self._search_cache.move_to_end(cache_key)
+            return results
+    
+    def _cache_search(self, cache_key: str, results: List[ActionSearchResult]):
+        with self._search_cache_lock:
+            self._search_cache[cache_key] = (time.time(), results)
+            self._search_cache.move_to_end(cache_key)
+            while len(self._search_cache) > self.search_cache_size:
+                self._search_cache.popitem(last=False)
+    
     def search(self, query: str, top_k: Optional[int] = None) -> List[ActionSearchResult]:
         """
         Perform hybrid search for action-related content
@@ -420,7 +1009,7 @@ class MasterActionsRetriever:
         Returns:
             List of ActionSearchResult objects
         """
-        if not self.vector_store or not self.ensemble_retriever or not self.documents:
+        if self.faiss_index is None or not self.bm25 or not self.documents:
             print("⚠️  Master Actions index not built - no results")
             return []
         
@@ -431,54 +1020,95 @@ class MasterActionsRetriever:
         
         # Check cache
         cache_key = f"master_search:{self.index_hash}:{expanded_query}:{top_k}"
-        cached = self._search_cache.get(cache_key)
+        cached = self._get_cached_search(cache_key)
         if cached:
             return cached
         
-        # Perform hybrid search
+        candidate_k = max(top_k, 5) * 2
+        bm25_tokens = _tokenize(expanded_query)
+        bm25_ids = None
+        query_vector = None
         try:
-            raw_docs = self.ensemble_retriever.invoke(expanded_query)
-            docs = list(raw_docs) if raw_docs else []
+            if self.bm25.max_score(bm25_tokens) > self.bm25_shortcut_threshold:
+                # A keyword shortcut is possible: score BM25 first and skip the
+                # embedding entirely if its top hit is a confident action chunk
+                bm25_ids, bm25_scores = self.bm25.top_n(bm25_tokens, candidate_k)
+                shortcut = (
+                    len(bm25_ids) > 0
+                    and bm25_scores[0] > self.bm25_shortcut_threshold
+                    and bool(self.marker_mask[bm25_ids[0]])
+                )
+                if not shortcut:
+                    query_vector = np.asarray(self.embeddings.embed_query(expanded_query), dtype=np.float32)
+            else:
+                query_vector = np.asarray(self.embeddings.embed_query(expanded_query), dtype=np.float32)
         except Exception as e:
             print(f"⚠️  Search error: {e}")
             return []
         
-        if not docs:
+        if query_vector is None:
+            fused_ids = bm25_ids.tolist()
+        else:
+            # The vector keys the semantic cache, checked before any remaining BM25 work
+            cached = self._semantic_cache.get(query_vector, top_k)
+            if cached:
+                return cached
+            
+            # Perform hybrid search: FAISS (C++, releases the GIL) runs on the worker pool
+            # while BM25 scores on this thread; rankings are merged with weighted RRF
+            try:
+                vector_future = self._executor.submit(
+                    self.faiss_index.search, query_vector.reshape(1, -1), candidate_k
+                )
+                if bm25_ids is None:
+                    bm25_ids, _ = self.bm25.top_n(bm25_tokens, candidate_k)
+                _, hits = vector_future.result()
+                vector_ids = [int(chunk_id) for chunk_id in hits[0]]
+                fused_ids = _rrf_fuse(
+                    [bm25_ids.tolist(), [i for i in vector_ids if 0 <= i < len(self.documents)]],
+                    [self.bm25_weight, self.vector_weight],
+                )
+            except Exception as e:
+                print(f"⚠️  Search error: {e}")
+                return []
+        
+        if not fused_ids:
             return []
         
         # Score and rank results
-        query_tokens = set(re.findall(r'\b\w+\b', query.lower()))
-        stop_words = {'a', 'an', 'the', 'is', 'are', 'to', 'for', 'of', 'in', 'on', 'how', 'what', 'i', 'my', 'can'}
-        query_tokens -= stop_words
+        query_tokens = set(_tokenize(query)) - STOP_WORDS
+        
+        # Vectorized scores: rank base + keyword boost + action boost (precomputed marker mask)
+        chunk_ids = np.asarray(fused_ids, dtype=np.int64)
+        base_scores = 1.0 / np.arange(1, len(chunk_ids) + 1, dtype=np.float32)
+        keyword_hits = np.fromiter(
+            (sum(1 for token in query_tokens if token in self.content_lower[chunk_id]) for chunk_id in fused_ids),
+            dtype=np.float32,
+            count=len(fused_ids),
+        )
+        action_boosts = (self.marker_mask[chunk_ids] != 0).astype(np.float32) * 0.2
+        scores = base_scores + 0.1 * keyword_hits + action_boosts
+        
+        # Top-k by score (ties keep fused rank order); only these chunks are materialized
+        order = np.arange(len(scores))
+        if len(scores) > top_k:
+            order = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = order[np.lexsort((order, -scores[order]))]
         
         results = []
-        for rank, doc in enumerate(docs):
-            base_score = 1.0 / (rank + 1)
-            
-            # Boost for keyword matches
-            content_lower = doc.page_content.lower()
-            keyword_hits = sum(1 for token in query_tokens if token in content_lower)
-            keyword_boost = 0.1 * keyword_hits
-            
-            # Boost for action-related keywords in content
-            action_markers = ['link:', 'steps:', 'step 1', 'step 2', 'click', 'navigate', 'select', 'action name:']
-            action_boost = 0.2 if any(marker in content_lower for marker in action_markers) else 0
-            
-            score = base_score + keyword_boost + action_boost
-            
+        for idx in order:
+            doc = self.documents[int(chunk_ids[idx])]
             results.append(ActionSearchResult(
                 content=doc.page_content,
                 source=doc.metadata.get('source', 'Master Actions Guide'),
-                score=score,
+                score=float(scores[idx]),
                 chunk_id=doc.metadata.get('chunk_id', -1)
             ))
         
-        # Sort by score and limit
-        results.sort(key=lambda r: r.score, reverse=True)
-        results = results[:top_k]
-        
         # Cache results
-        self._search_cache.set(cache_key, results, expire=3600)
+        self._cache_search(cache_key, results)
+        if query_vector is not None:
+            self._semantic_cache.set(query_vector, top_k, results)
         
         return results
 
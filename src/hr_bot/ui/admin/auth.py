@@ -5,35 +5,49 @@ Validates Chainlit JWT cookie and checks admin access.
 
 import os
 import logging
+import time
 from typing import Optional, Dict, Any
-from functools import wraps
+from functools import lru_cache, wraps
 
 import jwt
-from starlette.requests import Request
+from starlette.requests import Request, cookie_parser
 from starlette.responses import RedirectResponse, Response
+from starlette.types import Scope
 
 logger = logging.getLogger("hr_bot.admin.auth")
 
-# Admin emails from environment
-def _get_admin_emails() -> set:
+# Chainlit uses HS256 by default
+_JWT_ALGORITHMS = ["HS256"]
+
+
+# Admin emails from environment; read once, env vars do not change after startup
+@lru_cache(maxsize=1)
+def _get_admin_emails() -> frozenset:
     """Get set of admin emails from environment."""
     emails = os.getenv("ADMIN_EMAILS", "")
-    return {e.strip().lower() for e in emails.split(",") if e.strip()}
+    return frozenset(e.strip().lower() for e in emails.split(",") if e.strip())
 
 
+@lru_cache(maxsize=1)
 def _get_jwt_secret() -> str:
     """Get Chainlit JWT secret."""
     return os.getenv("CHAINLIT_AUTH_SECRET", "")
 
 
-def decode_chainlit_token(request: Request) -> Optional[Dict[str, Any]]:
+@lru_cache(maxsize=1024)
+def _decode_token(token: str) -> Dict[str, Any]:
     """
-    Decode Chainlit JWT token from cookies.
-    
-    Returns user data dict or None if invalid/missing.
+    Verify and decode a token once; later requests with the same cookie hit the cache.
+
+    Only successful decodes are cached (lru_cache does not cache exceptions), so
+    invalid tokens are rejected afresh each time. Expiry is re-checked per request
+    by the caller.
     """
-    # Chainlit uses 'access_token' cookie
-    token = request.cookies.get("access_token")
+    return jwt.decode(token, _get_jwt_secret(), algorithms=_JWT_ALGORITHMS)
+
+
+def _decode_access_token(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Verify a Chainlit access token; returns its payload or None."""
     if not token:
         logger.debug("No access_token cookie found")
         return None
@@ -44,9 +58,12 @@ def decode_chainlit_token(request: Request) -> Optional[Dict[str, Any]]:
         return None
     
     try:
-        # Chainlit uses HS256 by default
-        payload = jwt.decode(token, secret, algorithms=["HS256"])
-        return payload
+        payload = _decode_token(token)
+        # A cached payload may have expired since it was first verified
+        exp = payload.get("exp")
+        if exp is not None and time.time() >= exp:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return dict(payload)
     except jwt.ExpiredSignatureError:
         logger.debug("JWT token expired")
         return None
@@ -55,13 +72,18 @@ def decode_chainlit_token(request: Request) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_current_user(request: Request) -> Optional[Dict[str, Any]]:
+def decode_chainlit_token(request: Request) -> Optional[Dict[str, Any]]:
     """
-    Get current user from Chainlit JWT.
+    Decode Chainlit JWT token from cookies.
     
-    Returns dict with 'email', 'name', 'is_admin' or None.
+    Returns user data dict or None if invalid/missing.
     """
-    payload = decode_chainlit_token(request)
+    # Chainlit uses 'access_token' cookie
+    return _decode_access_token(request.cookies.get("access_token"))
+
+
+def _user_from_payload(payload: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Build the admin user dict ('email', 'name', 'is_admin') from a JWT payload."""
     if not payload:
         return None
     
@@ -98,22 +120,55 @@ def get_current_user(request: Request) -> Optional[Dict[str, Any]]:
     }
 
 
-def require_admin(request: Request) -> Optional[Response]:
+def get_current_user(request: Request) -> Optional[Dict[str, Any]]:
     """
-    Check if current user is admin.
+    Get current user from Chainlit JWT.
     
-    Returns None if authorized, or RedirectResponse if not.
+    Returns dict with 'email', 'name', 'is_admin' or None.
+    """
+    return _user_from_payload(decode_chainlit_token(request))
+
+
+def get_scope_user(scope: Scope) -> Optional[Dict[str, Any]]:
+    """
+    Get current user straight from an ASGI scope's Cookie header.
+    
+    Same result as get_current_user, without building a Request.
+    """
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            token = cookie_parser(value.decode("latin-1")).get("access_token")
+            return _user_from_payload(_decode_access_token(token))
+    return _user_from_payload(_decode_access_token(None))
+
+
+def admin_denial(user: Optional[Dict[str, Any]]) -> Optional[str]:
     """
-    user = get_current_user(request)
+    Reason an admin page must be refused for this user, or None if authorized.
     
+    The reason ('not_authenticated' / 'not_admin') is the ?error= value the main
+    app shows after the redirect.
+    """
     if not user:
         # Not logged in - redirect to main app
         logger.warning("Admin access denied: not authenticated")
-        return RedirectResponse(url="/?error=not_authenticated", status_code=302)
+        return "not_authenticated"
     
     if not user.get("is_admin"):
         # Logged in but not admin
         logger.warning(f"Admin access denied for user: {user.get('email')}")
-        return RedirectResponse(url="/?error=not_admin", status_code=302)
+        return "not_admin"
+    
+    return None  # Authorized
+
+
+def require_admin(request: Request) -> Optional[Response]:
+    """
+    Check if current user is admin.
     
+    Returns None if authorized, or RedirectResponse if not.
+    """
+    denial = admin_denial(get_current_user(request))
+    if denial:
+        return RedirectResponse(url=f"/?error={denial}", status_code=302)
     return None  # Authorized
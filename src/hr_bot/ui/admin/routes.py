@@ -1,23 +1,40 @@
 """
 Admin console routes.
 Serves admin pages and API endpoints.
+
+Handlers are plain ASGI callables ``(scope, receive, send)`` dispatched from a
+path table, so no Request/Response objects are built per request. Admin access
+is checked once, in AdminAuthMiddleware, before dispatch.
 """
 
 import os
+import json
+import time
+import uuid
+import html
+import asyncio
+import hashlib
 import logging
+import mimetypes
+from email.utils import formatdate
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import parse_qs, parse_qsl
 
-from starlette.applications import Starlette
-from starlette.routing import Route, Mount
-from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse, RedirectResponse
-from starlette.staticfiles import StaticFiles
-from jinja2 import Environment, FileSystemLoader
+import anyio
+from starlette.types import Receive, Scope, Send
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
-from .auth import get_current_user, require_admin
+from .auth import admin_denial, get_scope_user
 from .services import admin_services
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # JSON responses fall back to the stdlib encoder
+
 logger = logging.getLogger("hr_bot.admin.routes")
 
 # Template directory
@@ -28,101 +45,400 @@ STATIC_DIR = Path(__file__).parent / "static"
 TEMPLATE_DIR.mkdir(parents=True, exist_ok=True)
 STATIC_DIR.mkdir(parents=True, exist_ok=True)
 
-# Jinja2 environment
+# Jinja2 environment. Templates ship with the package, so they are never re-checked
+# on disk (auto_reload=False) or evicted (cache_size=-1); compiled bytecode is kept
+# in the per-user temp dir so restarts skip the parse/compile step.
 jinja_env = Environment(
     loader=FileSystemLoader(str(TEMPLATE_DIR)),
-    autoescape=True
+    autoescape=True,
+    auto_reload=False,
+    cache_size=-1,
+    bytecode_cache=FileSystemBytecodeCache(),
 )
 
+# Page templates, loaded once at import
+TEMPLATES = {
+    name: jinja_env.get_template(name)
+    for name in ("dashboard.html", "cache.html", "users.html", "logs.html", "rag.html", "settings.html")
+}
+
 
 def render_template(template_name: str, context: dict) -> str:
-    """Render a Jinja2 template."""
-    template = jinja_env.get_template(template_name)
-    return template.render(**context)
+    """Render a preloaded Jinja2 template."""
+    template = TEMPLATES[template_name]
+    # What Template.render() does, minus its dict(*args, **kwargs) copy of the context;
+    # new_context() already layers the context over the environment globals
+    try:
+        return jinja_env.concat(template.root_render_func(template.new_context(context)))
+    except Exception:
+        jinja_env.handle_exception()
+
+
+# -----------------------------------------------------------------------------
+# ASGI response helpers
+# -----------------------------------------------------------------------------
+
+HTML_HEADERS = [(b"content-type", b"text/html; charset=utf-8")]
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+
+async def send_response(send: Send, body: bytes, headers: Iterable[Tuple[bytes, bytes]], status: int = 200):
+    """Send a complete response: one start message, one body message."""
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [*headers, (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_html(send: Send, content, status: int = 200):
+    """Send an HTML page or partial (str, or already-encoded bytes)."""
+    body = content if isinstance(content, bytes) else content.encode("utf-8")
+    await send_response(send, body, HTML_HEADERS, status)
+
+
+def dumps_json(content) -> bytes:
+    """Compact UTF-8 JSON, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    # Same encoding as Starlette's JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+async def send_html_stream(send: Send, parts: Iterable[bytes]):
+    """Send an HTML response piece by piece (chunked), each part as soon as it is produced."""
+    await send({"type": "http.response.start", "status": 200, "headers": HTML_HEADERS})
+    for part in parts:
+        await send({"type": "http.response.body", "body": part, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def fixed_response(body: bytes, headers: Iterable[Tuple[bytes, bytes]], status: int = 200) -> Tuple[dict, dict]:
+    """
+    Build the ASGI messages of a constant response once; send_fixed() replays them.
+    
+    For bodies that never vary (rejections, 404s, validation notices), so repeated
+    hits allocate no headers and encode nothing.
+    """
+    start = {
+        "type": "http.response.start",
+        "status": status,
+        "headers": [*headers, (b"content-length", str(len(body)).encode())],
+    }
+    return start, {"type": "http.response.body", "body": body}
+
+
+async def send_fixed(send: Send, response: Tuple[dict, dict]):
+    start, body = response
+    await send(start)
+    await send(body)
+
+
+_NOT_FOUND = fixed_response(b"Not Found", [(b"content-type", b"text/plain; charset=utf-8")], 404)
+
+
+async def send_not_found(send: Send):
+    await send_fixed(send, _NOT_FOUND)
+
+
+async def send_method_not_allowed(send: Send, methods: Iterable[str]):
+    await send_response(
+        send, b"Method Not Allowed",
+        [(b"content-type", b"text/plain; charset=utf-8"), (b"allow", ", ".join(methods).encode())],
+        405,
+    )
+
+
+def get_header(scope: Scope, name: bytes) -> Optional[bytes]:
+    """First value of a (lower-case) request header."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+# The admin forms are a single short field; anything bigger is refused unread
+MAX_FORM_BYTES = 4 * 1024
+MAX_FORM_FIELDS = 4
+
+
+async def read_form(scope: Scope, receive: Receive) -> Optional[dict]:
+    """
+    Parse a small application/x-www-form-urlencoded body (what HTMX posts).
+    
+    Returns None once the body turns out larger than MAX_FORM_BYTES, without
+    buffering the rest of it.
+    """
+    length = get_header(scope, b"content-length")
+    if length is not None and length.isdigit() and int(length) > MAX_FORM_BYTES:
+        return None
+    
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_FORM_BYTES:
+            return None
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    
+    try:
+        return dict(parse_qsl(b"".join(chunks).decode("utf-8", "replace"), max_num_fields=MAX_FORM_FIELDS))
+    except ValueError:
+        # Too many fields
+        return None
+
+
+def query_params(scope: Scope) -> dict:
+    """First value of each query-string parameter."""
+    parsed = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return {key: values[0] for key, values in parsed.items()}
+
+
+# -----------------------------------------------------------------------------
+# HTMX partials
+# -----------------------------------------------------------------------------
+
+# Alert boxes returned by the action endpoints, pre-encoded; only the message varies
+_OK_PREFIX = '<div class="bg-green-500/20 border border-green-500/50 rounded-lg p-4 text-green-300">✅ '.encode()
+_ERROR_PREFIX = '<div class="bg-red-500/20 border border-red-500/50 rounded-lg p-4 text-red-300">❌ '.encode()
+_ALERT_SUFFIX = b"</div>"
+
+_CACHE_CLEAR_FAILED = _ERROR_PREFIX + b"Failed to clear cache." + _ALERT_SUFFIX
+_REBUILD_FAILED = _ERROR_PREFIX + b"Failed to rebuild index." + _ALERT_SUFFIX
+# Sent as 200: HTMX does not swap a 413, so the alert would never be shown
+_FORM_TOO_LARGE = fixed_response(_ERROR_PREFIX + b"Request too large." + _ALERT_SUFFIX, HTML_HEADERS)
+_EMPTY_QUERY = fixed_response(
+    '<div class="bg-yellow-500/20 border border-yellow-500/50 rounded-lg p-4 text-yellow-300">'
+    '⚠️ Please enter a search query.</div>'.encode(),
+    HTML_HEADERS,
+)
+
+
+def alert(prefix: bytes, *parts: str) -> bytes:
+    """Alert box with the given (HTML-escaped) message parts."""
+    return b"".join([prefix, *(html.escape(part).encode("utf-8") for part in parts), _ALERT_SUFFIX])
+
+
+# Test search results, streamed one row at a time
+_SEARCH_HEADER = """
+<div class="space-y-3">
+    <div class="text-green-400 font-medium">Found {count} results:</div>
+"""
+# Rows carry document text, so they go through Jinja's autoescaping
+_SEARCH_ROW_TPL = jinja_env.from_string("""
+    <div class="bg-gray-800/50 rounded-lg p-4 mb-3">
+        <div class="text-sm text-gray-400 mb-2">Result {{ i }} - {{ source }}</div>
+        <div class="text-gray-200">{{ content }}</div>
+    </div>
+""")
+_SEARCH_FOOTER = b"</div>"
+
+
+def search_result_parts(results: List[Dict[str, Any]]) -> Iterator[bytes]:
+    yield _SEARCH_HEADER.format(count=len(results)).encode("utf-8")
+    for i, r in enumerate(results, 1):
+        yield _SEARCH_ROW_TPL.render(i=i, source=r["source"], content=r["content"]).encode("utf-8")
+    yield _SEARCH_FOOTER
+
+# Cache stats grid; every value is a number or a pre-formatted size/percentage from
+# AdminServices.get_cache_stats, so plain str.format_map is enough
+_CACHE_STATS_HTML = """
+<div class="grid grid-cols-2 md:grid-cols-4 gap-4">
+    <div class="bg-gray-800/50 rounded-lg p-4">
+        <div class="text-2xl font-bold text-white">{total_entries}</div>
+        <div class="text-sm text-gray-400">Total Entries</div>
+    </div>
+    <div class="bg-gray-800/50 rounded-lg p-4">
+        <div class="text-2xl font-bold text-green-400">{hit_rate}</div>
+        <div class="text-sm text-gray-400">Hit Rate</div>
+    </div>
+    <div class="bg-gray-800/50 rounded-lg p-4">
+        <div class="text-2xl font-bold text-blue-400">{hits}</div>
+        <div class="text-sm text-gray-400">Cache Hits</div>
+    </div>
+    <div class="bg-gray-800/50 rounded-lg p-4">
+        <div class="text-2xl font-bold text-gray-400">{disk_size}</div>
+        <div class="text-sm text-gray-400">Disk Usage</div>
+    </div>
+</div>
+"""
+
+
+def cache_stats_partial(stats: Dict[str, Any]) -> str:
+    return _CACHE_STATS_HTML.format_map(stats)
+
+
+# -----------------------------------------------------------------------------
+# Stats cache
+# -----------------------------------------------------------------------------
+
+# Stats change slowly but pages poll them; concurrent misses share one computation
+STATS_TTL = 3.0
+
+_stats_cache: Dict[str, Tuple[float, "asyncio.Future"]] = {}
+
+
+async def cached_stats(key: str, compute: Callable[[], Awaitable[Any]], ttl: float = STATS_TTL) -> Any:
+    """Result of ``compute()``, reused for ``ttl`` seconds under ``key``."""
+    now = time.monotonic()
+    entry = _stats_cache.get(key)
+    if entry is None or now - entry[0] >= ttl:
+        entry = (now, asyncio.ensure_future(compute()))
+        _stats_cache[key] = entry
+    try:
+        # shield: a cancelled waiter must not cancel the computation other waiters share
+        return await asyncio.shield(entry[1])
+    except Exception:
+        if _stats_cache.get(key) is entry:
+            del _stats_cache[key]
+        raise
+
+
+def invalidate_stats():
+    """Drop all cached stats; called after any admin action that changes them."""
+    _stats_cache.clear()
+
+
+def _dashboard_stats() -> Awaitable[Dict[str, Any]]:
+    return cached_stats("dashboard", lambda: asyncio.to_thread(admin_services.get_dashboard_stats))
+
+
+# -----------------------------------------------------------------------------
+# Background jobs
+# -----------------------------------------------------------------------------
+
+# Long-running actions (index rebuild, S3 refresh) run as asyncio tasks; the page
+# polls /api/jobs/{id} for the result instead of holding the request open
+JOBS_PREFIX = "/api/jobs/"
+MAX_JOBS = 100
+
+JOBS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_JOB_TASKS: Set[asyncio.Task] = set()
+# kind -> id of the job of that kind still running; repeat clicks attach to it
+_RUNNING_JOBS: Dict[str, str] = {}
+
+_UNKNOWN_JOB = _ERROR_PREFIX + b"Unknown or expired job." + _ALERT_SUFFIX
+
+
+def start_job(kind: str, label: str, run: Callable[[], Awaitable[bytes]]) -> str:
+    """
+    Run ``run()`` (resolving to the final HTML partial) in the background; returns the job id.
+    
+    If a job of the same ``kind`` is still running, no new one is started and its id is returned.
+    """
+    running = _RUNNING_JOBS.get(kind)
+    if running is not None:
+        return running
+    
+    job_id = uuid.uuid4().hex
+    JOBS[job_id] = {"kind": kind, "status": "running", "label": label, "started": time.time(), "html": None}
+    _RUNNING_JOBS[kind] = job_id
+    # Forget the oldest jobs; their pollers get the "unknown job" partial
+    while len(JOBS) > MAX_JOBS:
+        JOBS.popitem(last=False)
+    
+    task = asyncio.create_task(_run_job(job_id, JOBS[job_id], run))
+    # The event loop only keeps weak references to tasks
+    _JOB_TASKS.add(task)
+    task.add_done_callback(_JOB_TASKS.discard)
+    return job_id
+
+
+async def _run_job(job_id: str, job: Dict[str, Any], run: Callable[[], Awaitable[bytes]]):
+    try:
+        job["html"] = await run()
+        job["status"] = "done"
+    except Exception as e:
+        logger.exception("Admin job failed")
+        job["html"] = alert(_ERROR_PREFIX, "Error: ", str(e))
+        job["status"] = "failed"
+    finally:
+        job["finished"] = time.time()
+        if _RUNNING_JOBS.get(job["kind"]) == job_id:
+            del _RUNNING_JOBS[job["kind"]]
+
+
+def job_poller(job_id: str, label: str) -> bytes:
+    """Placeholder that re-fetches the job status every 2s and replaces itself with it."""
+    return (
+        f'<div hx-get="/admin{JOBS_PREFIX}{job_id}" hx-trigger="every 2s" hx-swap="outerHTML" '
+        f'class="bg-blue-500/20 border border-blue-500/50 rounded-lg p-4 text-blue-300">'
+        f'⏳ {html.escape(label)}…</div>'
+    ).encode("utf-8")
 
 
 # -----------------------------------------------------------------------------
 # Page Routes
 # -----------------------------------------------------------------------------
 
-async def dashboard(request: Request) -> HTMLResponse:
+async def dashboard(scope: Scope, receive: Receive, send: Send):
     """Main admin dashboard."""
-    # Check auth
-    redirect = require_admin(request)
-    if redirect:
-        return redirect
+    user = scope["state"]["user"]
     
-    user = get_current_user(request)
-    stats = admin_services.get_dashboard_stats()
+    stats = await _dashboard_stats()
     
-    return HTMLResponse(render_template("dashboard.html", {
+    await send_html(send, render_template("dashboard.html", {
         "user": user,
         "stats": stats,
         "page": "dashboard"
     }))
 
 
-async def cache_page(request: Request) -> HTMLResponse:
+async def cache_page(scope: Scope, receive: Receive, send: Send):
     """Cache management page."""
-    redirect = require_admin(request)
-    if redirect:
-        return redirect
+    user = scope["state"]["user"]
     
-    user = get_current_user(request)
-    cache_stats = admin_services.get_cache_stats()
-    entries = admin_services.get_cache_entries(limit=50)
+    bundle = await cached_stats("cache_page", lambda: admin_services.get_cache_page_bundle(limit=50))
     
-    return HTMLResponse(render_template("cache.html", {
+    await send_html(send, render_template("cache.html", {
         "user": user,
-        "stats": cache_stats,
-        "entries": entries,
+        "stats": bundle["stats"],
+        "entries": bundle["entries"],
         "page": "cache"
     }))
 
 
-async def users_page(request: Request) -> HTMLResponse:
+async def users_page(scope: Scope, receive: Receive, send: Send):
     """User management page."""
-    redirect = require_admin(request)
-    if redirect:
-        return redirect
+    user = scope["state"]["user"]
     
-    user = get_current_user(request)
-    users = admin_services.get_users()
-    admin_emails = admin_services.get_admin_emails()
+    bundle = await admin_services.get_users_page_bundle()
     
-    return HTMLResponse(render_template("users.html", {
+    await send_html(send, render_template("users.html", {
         "user": user,
-        "users": users,
-        "admin_emails": admin_emails,
+        "users": bundle["users"],
+        "admin_emails": bundle["admin_emails"],
         "page": "users"
     }))
 
 
-async def logs_page(request: Request) -> HTMLResponse:
+async def logs_page(scope: Scope, receive: Receive, send: Send):
     """Logs viewer page."""
-    redirect = require_admin(request)
-    if redirect:
-        return redirect
+    user = scope["state"]["user"]
     
-    user = get_current_user(request)
-    params = request.query_params
+    params = query_params(scope)
     user_filter = params.get("user")
     source_filter = params.get("source")
     search_filter = params.get("search")
-    query_logs = admin_services.get_query_logs(
+    bundle = await admin_services.get_logs_page_bundle(
         limit=200,
         user=user_filter,
         source=source_filter,
         search=search_filter,
     )
-    audit_logs = admin_services.get_admin_audit_log(limit=50)
-    users = admin_services.list_log_users()
     
-    return HTMLResponse(render_template("logs.html", {
+    await send_html(send, render_template("logs.html", {
         "user": user,
-        "query_logs": query_logs,
-        "audit_logs": audit_logs,
-        "users": users,
+        "query_logs": bundle["query_logs"],
+        "audit_logs": bundle["audit_logs"],
+        "users": bundle["users"],
         "filters": {
             "user": user_filter or "",
             "source": source_filter or "",
@@ -132,34 +448,25 @@ async def logs_page(request: Request) -> HTMLResponse:
     }))
 
 
-async def rag_page(request: Request) -> HTMLResponse:
+async def rag_page(scope: Scope, receive: Receive, send: Send):
     """RAG index management page."""
-    redirect = require_admin(request)
-    if redirect:
-        return redirect
+    user = scope["state"]["user"]
     
-    user = get_current_user(request)
-    rag_stats = admin_services.get_rag_stats()
-    doc_stats = admin_services.get_document_stats()
+    bundle = await cached_stats("rag_page", admin_services.get_rag_page_bundle)
     
-    return HTMLResponse(render_template("rag.html", {
+    await send_html(send, render_template("rag.html", {
         "user": user,
-        "rag_stats": rag_stats,
-        "doc_stats": doc_stats,
+        "rag_stats": bundle["rag_stats"],
+        "doc_stats": bundle["doc_stats"],
         "page": "rag"
     }))
 
 
-async def settings_page(request: Request) -> HTMLResponse:
-    """Settings page."""
-    redirect = require_admin(request)
-    if redirect:
-        return redirect
-    
-    user = get_current_user(request)
-    
-    # Get relevant settings (non-sensitive)
-    settings = {
+# Env vars do not change after startup; read once, on first use (after .env is loaded)
+@lru_cache(maxsize=1)
+def _settings_snapshot() -> dict:
+    """Relevant settings (non-sensitive) shown on the settings page."""
+    return {
         "APP_NAME": os.getenv("APP_NAME", "Inara"),
         "APP_DESCRIPTION": os.getenv("APP_DESCRIPTION", "your intelligent assistant"),
         "CACHE_TTL_HOURS": os.getenv("CACHE_TTL_HOURS", "72"),
@@ -169,8 +476,15 @@ async def settings_page(request: Request) -> HTMLResponse:
         "VECTOR_WEIGHT": os.getenv("VECTOR_WEIGHT", "0.5"),
         "SUPPORT_CONTACT_EMAIL": os.getenv("SUPPORT_CONTACT_EMAIL", ""),
     }
+
+
+async def settings_page(scope: Scope, receive: Receive, send: Send):
+    """Settings page."""
+    user = scope["state"]["user"]
+    
+    settings = _settings_snapshot()
     
-    return HTMLResponse(render_template("settings.html", {
+    await send_html(send, render_template("settings.html", {
         "user": user,
         "settings": settings,
         "page": "settings"
@@ -181,184 +495,405 @@ async def settings_page(request: Request) -> HTMLResponse:
 # API Routes (for HTMX)
 # -----------------------------------------------------------------------------
 
-async def api_stats(request: Request) -> JSONResponse:
+# (stats dict, encoded body) of the last /api/stats response; reused while the stats cache returns the same dict
+_stats_json: Tuple[Optional[dict], bytes] = (None, b"")
+
+
+async def api_stats(scope: Scope, receive: Receive, send: Send):
     """Get dashboard stats as JSON."""
-    redirect = require_admin(request)
-    if redirect:
-        return JSONResponse({"error": "Unauthorized"}, status_code=403)
+    global _stats_json
+    
+    stats = await _dashboard_stats()
+    cached, body = _stats_json
+    if cached is not stats:
+        body = dumps_json(stats)
+        _stats_json = (stats, body)
     
-    stats = admin_services.get_dashboard_stats()
-    return JSONResponse(stats)
+    await send_response(send, body, JSON_HEADERS)
 
 
-async def api_clear_cache(request: Request) -> HTMLResponse:
+async def api_clear_cache(scope: Scope, receive: Receive, send: Send):
     """Clear all cache entries."""
-    redirect = require_admin(request)
-    if redirect:
-        return HTMLResponse("<div class='text-red-400'>Unauthorized</div>", status_code=403)
+    user = scope["state"]["user"]
     
-    user = get_current_user(request)
-    admin_services._log_admin_action("clear_cache", {}, user.get("email", "unknown"))
+    await asyncio.to_thread(admin_services._log_admin_action, "clear_cache", {}, user.get("email", "unknown"))
     
-    result = admin_services.clear_cache()
+    result = await asyncio.to_thread(admin_services.clear_cache)
+    invalidate_stats()
     
     if result["success"]:
-        return HTMLResponse(f"""
-            <div class="bg-green-500/20 border border-green-500/50 rounded-lg p-4 text-green-300">
-                ✅ Cache cleared successfully. {result['entries_cleared']} entries removed.
-            </div>
-        """)
+        await send_html(send, alert(_OK_PREFIX, f"Cache cleared successfully. {result['entries_cleared']} entries removed."))
     else:
-        return HTMLResponse(f"""
-            <div class="bg-red-500/20 border border-red-500/50 rounded-lg p-4 text-red-300">
-                ❌ Failed to clear cache.
-            </div>
-        """)
-
-
-async def api_refresh_docs(request: Request) -> HTMLResponse:
-    """Refresh S3 documents."""
-    redirect = require_admin(request)
-    if redirect:
-        return HTMLResponse("<div class='text-red-400'>Unauthorized</div>", status_code=403)
-    
-    user = get_current_user(request)
-    admin_services._log_admin_action("refresh_s3_documents", {}, user.get("email", "unknown"))
-    
-    # Run for both roles
-    result_emp = admin_services.refresh_s3_documents("employee")
-    result_exec = admin_services.refresh_s3_documents("executive")
-    
-    if result_emp["success"]:
-        return HTMLResponse(f"""
-            <div class="bg-green-500/20 border border-green-500/50 rounded-lg p-4 text-green-300">
-                ✅ {result_emp['message']}
-            </div>
-        """)
-    else:
-        return HTMLResponse(f"""
-            <div class="bg-red-500/20 border border-red-500/50 rounded-lg p-4 text-red-300">
-                ❌ Error: {result_emp.get('error', 'Unknown error')}
-            </div>
-        """)
+        await send_html(send, _CACHE_CLEAR_FAILED)
 
 
-async def api_rebuild_index(request: Request) -> HTMLResponse:
-    """Rebuild RAG index."""
-    redirect = require_admin(request)
-    if redirect:
-        return HTMLResponse("<div class='text-red-400'>Unauthorized</div>", status_code=403)
+async def _refresh_docs_job() -> bytes:
+    # Run for both roles, one after the other: each refresh deletes and rebuilds the
+    # shared RAG index, so running them together could delete it mid-rebuild
+    result_emp = await asyncio.to_thread(admin_services.refresh_s3_documents, "employee")
+    result_exec = await asyncio.to_thread(admin_services.refresh_s3_documents, "executive")
+    invalidate_stats()
     
-    user = get_current_user(request)
-    admin_services._log_admin_action("rebuild_rag_index", {}, user.get("email", "unknown"))
+    for role, result in (("employee", result_emp), ("executive", result_exec)):
+        if not result["success"]:
+            return alert(_ERROR_PREFIX, f"Error ({role}): ", result.get("error", "Unknown error"))
+    return alert(_OK_PREFIX, result_emp["message"])
+
+
+async def api_refresh_docs(scope: Scope, receive: Receive, send: Send):
+    """Refresh S3 documents (as a background job the page polls)."""
+    user = scope["state"]["user"]
     
-    result = admin_services.rebuild_rag_index()
+    await asyncio.to_thread(admin_services._log_admin_action, "refresh_s3_documents", {}, user.get("email", "unknown"))
     
+    job_id = start_job("refresh_docs", "Refreshing documents from S3", _refresh_docs_job)
+    await send_html(send, job_poller(job_id, JOBS[job_id]["label"]), status=202)
+
+
+async def _rebuild_index_job() -> bytes:
+    result = await asyncio.to_thread(admin_services.rebuild_rag_index)
+    invalidate_stats()
     if result["success"]:
-        return HTMLResponse(f"""
-            <div class="bg-green-500/20 border border-green-500/50 rounded-lg p-4 text-green-300">
-                ✅ {result['message']}
-            </div>
-        """)
-    else:
-        return HTMLResponse(f"""
-            <div class="bg-red-500/20 border border-red-500/50 rounded-lg p-4 text-red-300">
-                ❌ Failed to rebuild index.
-            </div>
-        """)
+        return alert(_OK_PREFIX, result["message"])
+    return _REBUILD_FAILED
 
 
-async def api_test_search(request: Request) -> HTMLResponse:
-    """Test RAG search."""
-    redirect = require_admin(request)
-    if redirect:
-        return HTMLResponse("<div class='text-red-400'>Unauthorized</div>", status_code=403)
+async def api_rebuild_index(scope: Scope, receive: Receive, send: Send):
+    """Rebuild RAG index (as a background job the page polls)."""
+    user = scope["state"]["user"]
+    
+    await asyncio.to_thread(admin_services._log_admin_action, "rebuild_rag_index", {}, user.get("email", "unknown"))
     
-    form = await request.form()
+    job_id = start_job("rebuild_index", "Rebuilding RAG index", _rebuild_index_job)
+    await send_html(send, job_poller(job_id, JOBS[job_id]["label"]), status=202)
+
+
+async def api_test_search(scope: Scope, receive: Receive, send: Send):
+    """Test RAG search."""
+    form = await read_form(scope, receive)
+    if form is None:
+        return await send_fixed(send, _FORM_TOO_LARGE)
     query = form.get("query", "").strip()
     
     if not query:
-        return HTMLResponse("""
-            <div class="bg-yellow-500/20 border border-yellow-500/50 rounded-lg p-4 text-yellow-300">
-                ⚠️ Please enter a search query.
-            </div>
-        """)
+        return await send_fixed(send, _EMPTY_QUERY)
     
-    result = admin_services.test_rag_search(query)
+    result = await asyncio.to_thread(admin_services.test_rag_search, query)
     
     if result["success"]:
-        results_html = ""
-        for i, r in enumerate(result["results"], 1):
-            results_html += f"""
-                <div class="bg-gray-800/50 rounded-lg p-4 mb-3">
-                    <div class="text-sm text-gray-400 mb-2">Result {i} - {r['source']}</div>
-                    <div class="text-gray-200">{r['content']}</div>
-                </div>
-            """
-        
-        return HTMLResponse(f"""
-            <div class="space-y-3">
-                <div class="text-green-400 font-medium">Found {len(result['results'])} results:</div>
-                {results_html}
-            </div>
-        """)
+        await send_html_stream(send, search_result_parts(result["results"]))
     else:
-        return HTMLResponse(f"""
-            <div class="bg-red-500/20 border border-red-500/50 rounded-lg p-4 text-red-300">
-                ❌ Search error: {result.get('error', 'Unknown')}
-            </div>
-        """)
+        await send_html(send, alert(_ERROR_PREFIX, "Search error: ", result.get("error", "Unknown")))
+
 
+async def api_job_status(scope: Scope, receive: Receive, send: Send):
+    """Status partial for a background job; keeps polling until the job is finished."""
+    job_id = route_path(scope)[len(JOBS_PREFIX):]
+    job = JOBS.get(job_id)
+    
+    if job is None:
+        # 286 makes HTMX swap the alert in and stop polling; it skips non-2xx responses
+        return await send_html(send, _UNKNOWN_JOB, status=286)
+    if job["status"] == "running":
+        return await send_html(send, job_poller(job_id, job["label"]))
+    await send_html(send, job["html"])
 
-async def api_cache_stats_partial(request: Request) -> HTMLResponse:
+
+async def api_cache_stats_partial(scope: Scope, receive: Receive, send: Send):
     """Return cache stats as HTML partial for HTMX refresh."""
-    redirect = require_admin(request)
-    if redirect:
-        return HTMLResponse("<div class='text-red-400'>Unauthorized</div>", status_code=403)
-    
-    stats = admin_services.get_cache_stats()
-    
-    return HTMLResponse(f"""
-        <div class="grid grid-cols-2 md:grid-cols-4 gap-4">
-            <div class="bg-gray-800/50 rounded-lg p-4">
-                <div class="text-2xl font-bold text-white">{stats['total_entries']}</div>
-                <div class="text-sm text-gray-400">Total Entries</div>
-            </div>
-            <div class="bg-gray-800/50 rounded-lg p-4">
-                <div class="text-2xl font-bold text-green-400">{stats['hit_rate']}</div>
-                <div class="text-sm text-gray-400">Hit Rate</div>
-            </div>
-            <div class="bg-gray-800/50 rounded-lg p-4">
-                <div class="text-2xl font-bold text-blue-400">{stats['hits']}</div>
-                <div class="text-sm text-gray-400">Cache Hits</div>
-            </div>
-            <div class="bg-gray-800/50 rounded-lg p-4">
-                <div class="text-2xl font-bold text-gray-400">{stats['disk_size']}</div>
-                <div class="text-sm text-gray-400">Disk Usage</div>
-            </div>
-        </div>
-    """)
+    stats = await cached_stats("cache", lambda: asyncio.to_thread(admin_services.get_cache_stats))
+    
+    await send_html(send, cache_stats_partial(stats))
+
+
+# Server-sent events: one long-lived connection per open page instead of timer polling
+SSE_INTERVAL = 3.0
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+def sse_event(event: str, data: str) -> bytes:
+    lines = "".join(f"data: {line}\n" for line in data.splitlines())
+    return f"event: {event}\n{lines}\n".encode("utf-8")
+
+
+async def api_events(scope: Scope, receive: Receive, send: Send):
+    """
+    Push the cache-stats partial whenever it changes (checked every SSE_INTERVAL).
+    
+    Every connection reads the same short-TTL stats cache, so any number of open
+    pages costs one stats computation per interval.
+    """
+    disconnected = asyncio.Event()
+    
+    async def watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        disconnected.set()
+    
+    watcher = asyncio.create_task(watch_disconnect())
+    await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+    try:
+        last_stats = None
+        last_html = None
+        while not disconnected.is_set():
+            stats = await cached_stats("cache", lambda: asyncio.to_thread(admin_services.get_cache_stats))
+            if stats is not last_stats:
+                last_stats = stats
+                html_partial = cache_stats_partial(stats)
+                if html_partial != last_html:
+                    last_html = html_partial
+                    await send({"type": "http.response.body", "body": sse_event("cache-stats", html_partial), "more_body": True})
+            try:
+                await asyncio.wait_for(disconnected.wait(), SSE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        watcher.cancel()
 
 
 # -----------------------------------------------------------------------------
 # Route Definitions
 # -----------------------------------------------------------------------------
 
-routes = [
-    Route("/", dashboard),
-    Route("/cache", cache_page),
-    Route("/users", users_page),
-    Route("/logs", logs_page),
-    Route("/rag", rag_page),
-    Route("/settings", settings_page),
+# path -> (handler, allowed methods)
+PATHS = {
+    "/": (dashboard, ("GET", "HEAD")),
+    "/cache": (cache_page, ("GET", "HEAD")),
+    "/users": (users_page, ("GET", "HEAD")),
+    "/logs": (logs_page, ("GET", "HEAD")),
+    "/rag": (rag_page, ("GET", "HEAD")),
+    "/settings": (settings_page, ("GET", "HEAD")),
     # API endpoints for HTMX
-    Route("/api/stats", api_stats),
-    Route("/api/cache/clear", api_clear_cache, methods=["POST"]),
-    Route("/api/cache/stats", api_cache_stats_partial),
-    Route("/api/docs/refresh", api_refresh_docs, methods=["POST"]),
-    Route("/api/rag/rebuild", api_rebuild_index, methods=["POST"]),
-    Route("/api/rag/search", api_test_search, methods=["POST"]),
-]
+    "/api/stats": (api_stats, ("GET", "HEAD")),
+    "/api/cache/clear": (api_clear_cache, ("POST",)),
+    "/api/cache/stats": (api_cache_stats_partial, ("GET", "HEAD")),
+    "/api/events": (api_events, ("GET",)),
+    "/api/docs/refresh": (api_refresh_docs, ("POST",)),
+    "/api/rag/rebuild": (api_rebuild_index, ("POST",)),
+    "/api/rag/search": (api_test_search, ("POST",)),
+    # JOBS_PREFIX + "{id}" -> api_job_status (matched by prefix in dispatch)
+}
+
+# (method, path) -> handler: a hit is the whole routing decision
+DISPATCH = {
+    (method, path): handler
+    for path, (handler, methods) in PATHS.items()
+    for method in methods
+}
+
+
+def route_path(scope: Scope) -> str:
+    """Path relative to where the admin app is mounted (e.g. under /admin)."""
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    # Newer Starlette keeps the full path and records the mount in root_path
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    return path or "/"
+
+
+async def dispatch(scope: Scope, receive: Receive, send: Send):
+    """Admin ASGI app: one (method, path) dict lookup per request instead of a Route scan."""
+    if scope["type"] != "http":
+        return
+    
+    method = scope["method"]
+    path = route_path(scope)
+    handler = DISPATCH.get((method, path))
+    if handler is not None:
+        return await handler(scope, receive, send)
+    
+    # Miss: a job status poll, a known path with the wrong method, or a 404
+    if path.startswith(JOBS_PREFIX):
+        handler, methods = api_job_status, ("GET", "HEAD")
+    elif path in PATHS:
+        handler, methods = PATHS[path]
+    else:
+        return await send_not_found(send)
+    
+    if method not in methods:
+        return await send_method_not_allowed(send, methods)
+    await handler(scope, receive, send)
+
+
+# Rejections: API calls get a 403, pages redirect to the main app with the reason
+_UNAUTH_HTML = fixed_response(b"<div class='text-red-400'>Unauthorized</div>", HTML_HEADERS, 403)
+_UNAUTH_JSON = fixed_response(b'{"error":"Unauthorized"}', JSON_HEADERS, 403)
+_DENIAL_REDIRECTS = {
+    denial: fixed_response(b"", [(b"location", f"/?error={denial}".encode())], 302)
+    for denial in ("not_authenticated", "not_admin")
+}
 
-# Create the admin app
-admin_routes = Starlette(routes=routes)
+
+class AdminAuthMiddleware:
+    """
+    Admin access check, done once per request before dispatch.
+    
+    Authorized requests carry the user dict in ``scope["state"]["user"]`` for the
+    handlers; anyone else gets a redirect (pages) or a 403 (API endpoints).
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        
+        user = get_scope_user(scope)
+        denial = admin_denial(user)
+        if denial:
+            path = route_path(scope)
+            if path == "/api/stats":
+                return await send_fixed(send, _UNAUTH_JSON)
+            if path.startswith("/api/"):
+                return await send_fixed(send, _UNAUTH_HTML)
+            return await send_fixed(send, _DENIAL_REDIRECTS[denial])
+        
+        scope.setdefault("state", {})["user"] = user
+        await self.app(scope, receive, send)
+
+
+admin_routes = AdminAuthMiddleware(dispatch)
+
+
+# -----------------------------------------------------------------------------
+# Static Files
+# -----------------------------------------------------------------------------
+
+STATIC_CHUNK_SIZE = 64 * 1024
+
+
+# Compressed siblings served in place of the original, best first
+STATIC_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 1024
+
+
+class StaticAsset(NamedTuple):
+    path: str
+    size: int
+    etag: bytes
+    headers: List[Tuple[bytes, bytes]]
+
+
+def _static_asset(path: Path, media_type: str, encoding: Optional[str] = None, vary: bool = False) -> StaticAsset:
+    """Stat a static file once and precompute its response headers."""
+    st = path.stat()
+    # Same ETag scheme as Starlette's FileResponse
+    etag = f'"{hashlib.md5(f"{st.st_mtime}-{st.st_size}".encode(), usedforsecurity=False).hexdigest()}"'.encode()
+    headers = [
+        (b"content-type", media_type.encode("latin-1")),
+        (b"content-length", str(st.st_size).encode()),
+        (b"etag", etag),
+        (b"last-modified", formatdate(st.st_mtime, usegmt=True).encode()),
+    ]
+    if encoding:
+        headers.append((b"content-encoding", encoding.encode()))
+    if vary:
+        headers.append((b"vary", b"Accept-Encoding"))
+    return StaticAsset(path=str(path), size=st.st_size, etag=etag, headers=headers)
+
+
+def scan_static_dir(static_dir: Path) -> Dict[str, Dict[str, StaticAsset]]:
+    """
+    Map each URL path under the static mount ("/admin.css") to its variants by
+    content encoding ("identity", plus "gzip"/"br" when pre-compressed files exist).
+    
+    The .gz/.br files are written at build time by scripts/sync_public_assets.py;
+    variants older than their source are ignored rather than served stale.
+    """
+    suffixes = tuple(suffix for _, suffix in STATIC_ENCODINGS)
+    files = {}
+    for path in static_dir.rglob("*"):
+        if not path.is_file() or path.name.endswith(suffixes):
+            continue
+        
+        media_type = mimetypes.guess_type(path.name)[0] or "text/plain"
+        compressible = media_type.startswith(COMPRESSIBLE_TYPES) and path.stat().st_size >= MIN_COMPRESS_SIZE
+        if media_type.startswith("text/"):
+            media_type += "; charset=utf-8"
+        
+        variants = {}
+        if compressible:
+            mtime = path.stat().st_mtime
+            for encoding, suffix in STATIC_ENCODINGS:
+                sibling = path.with_name(path.name + suffix)
+                if sibling.is_file() and sibling.stat().st_mtime >= mtime:
+                    variants[encoding] = _static_asset(sibling, media_type, encoding, vary=True)
+        variants["identity"] = _static_asset(path, media_type, vary=bool(variants))
+        files["/" + path.relative_to(static_dir).as_posix()] = variants
+    return files
+
+
+# Static files ship with the package, so they are indexed once at import
+STATIC_FILES = scan_static_dir(STATIC_DIR)
+
+
+def accepted_encodings(scope: Scope) -> frozenset:
+    """Content codings the client accepts (ignoring q-values other than q=0)."""
+    accept = get_header(scope, b"accept-encoding")
+    if not accept:
+        return frozenset()
+    accepted = set()
+    for part in accept.decode("latin-1").split(","):
+        coding, _, params = part.partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return frozenset(accepted)
+
+
+def pick_variant(scope: Scope, variants: Dict[str, StaticAsset]) -> StaticAsset:
+    """Best pre-compressed variant the client accepts, else the original file."""
+    if len(variants) > 1:
+        accepted = accepted_encodings(scope)
+        for encoding, _ in STATIC_ENCODINGS:
+            if encoding in variants and (encoding in accepted or "*" in accepted):
+                return variants[encoding]
+    return variants["identity"]
+
+
+async def send_static_body(scope: Scope, send: Send, asset: StaticAsset):
+    """Send a file body, letting the server copy it in-kernel when it supports that."""
+    extensions = scope.get("extensions") or {}
+    if "http.response.zerocopysend" in extensions:
+        with open(asset.path, "rb") as f:
+            await send({"type": "http.response.zerocopysend", "file": f, "count": asset.size})
+    elif "http.response.pathsend" in extensions:
+        await send({"type": "http.response.pathsend", "path": asset.path})
+    else:
+        async with await anyio.open_file(asset.path, "rb") as f:
+            more_body = True
+            while more_body:
+                chunk = await f.read(STATIC_CHUNK_SIZE)
+                more_body = len(chunk) == STATIC_CHUNK_SIZE
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+async def admin_static(scope: Scope, receive: Receive, send: Send):
+    """Admin static files ASGI app (CSS/JS), mounted at /admin/static."""
+    if scope["type"] != "http":
+        return
+    
+    if scope["method"] not in ("GET", "HEAD"):
+        return await send_method_not_allowed(send, ("GET", "HEAD"))
+    
+    variants = STATIC_FILES.get(route_path(scope))
+    if variants is None:
+        return await send_not_found(send)
+    asset = pick_variant(scope, variants)
+    
+    if_none_match = get_header(scope, b"if-none-match")
+    if if_none_match and asset.etag in (tag.strip() for tag in if_none_match.split(b",")):
+        await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", asset.etag)]})
+        return await send({"type": "http.response.body", "body": b""})
+    
+    await send({"type": "http.response.start", "status": 200, "headers": asset.headers})
+    if scope["method"] == "HEAD":
+        return await send({"type": "http.response.body", "body": b""})
+    await send_static_body(scope, send, asset)
@@ -3,15 +3,167 @@ Admin console services - data gathering and operations.
 """
 
 import os
+import sys
 import json
+import atexit
 import shutil
+import time
+import asyncio
 import logging
+import tempfile
+import threading
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # JSONL reads and writes fall back to the stdlib json module
+
+try:
+    import psutil
+except ImportError:
+    psutil = None  # uptime shows as "Unknown"
 
 logger = logging.getLogger("hr_bot.admin.services")
 
+# Seconds a counter change may wait before it is written to admin_stats.json
+STATS_FLUSH_INTERVAL = 10.0
+
+# Parsed queries.jsonl entries kept in memory; enough for the logs page and its user list
+QUERY_LOG_TAIL = 500
+
+# Sentinel the RAG index builder writes with the index's file count, size and build time
+RAG_INDEX_META = ".meta.json"
+
+# Parser for the JSONL logs; accepts str or bytes lines either way
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+@lru_cache(maxsize=None)
+def _email_set(var_name: str) -> frozenset:
+    """Lower-cased emails from a comma-separated env var; parsed once, env does not change after startup."""
+    return frozenset(e.strip().lower() for e in os.getenv(var_name, "").split(",") if e.strip())
+
+
+@lru_cache(maxsize=1)
+def _cache_ttl() -> timedelta:
+    """Response cache lifetime (CACHE_TTL_HOURS), read once."""
+    return timedelta(hours=int(os.getenv("CACHE_TTL_HOURS", "72")))
+
+
+if sys.version_info >= (3, 11):
+    # Accepts the trailing "Z" natively
+    _parse_iso = datetime.fromisoformat
+else:
+    def _parse_iso(s: str) -> datetime:
+        """datetime.fromisoformat that also accepts a trailing "Z" (UTC)."""
+        return datetime.fromisoformat(s[:-1] + "+00:00" if s.endswith("Z") else s)
+
+
+def _dumps_line(entry: Dict[str, Any]) -> bytes:
+    """One JSONL record, newline included, ready for a single write()."""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(entry) + "\n").encode("utf-8")
+
+
+def _tail_jsonl(path: Path, limit: int, block: int = 65536, end: Optional[int] = None) -> List[Any]:
+    """
+    The last ``limit`` records of a JSONL file, newest first.
+    
+    Reads backwards from the end (or from byte ``end``) in ``block``-sized chunks until
+    enough lines are in hand, so the cost follows ``limit`` rather than the file size.
+    Unparseable lines are skipped; a missing file yields [].
+    """
+    if limit <= 0:
+        return []
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return []
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        if end is not None:
+            size = min(size, end)
+        pos = size
+        chunks: List[bytes] = []
+        newlines = 0
+        while pos > 0 and newlines <= limit:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+    lines = b"".join(reversed(chunks)).splitlines()
+    if pos > 0:
+        lines = lines[1:]  # starts mid-line
+    
+    records = []
+    for line in reversed(lines[-limit:]):
+        if not line:
+            continue
+        try:
+            records.append(_loads(line))
+        except Exception:
+            continue
+    return records
+
+
+# The bot, RAG tool and S3 loader pull in CrewAI, LangChain and boto3, so they are
+# resolved on first use rather than at import; later calls reuse the class
+@lru_cache(maxsize=None)
+def _hr_bot_cls():
+    from hr_bot.crew import HrBot
+    return HrBot
+
+
+@lru_cache(maxsize=None)
+def _hybrid_rag_tool_cls():
+    from hr_bot.tools.hybrid_rag_tool import HybridRAGTool
+    return HybridRAGTool
+
+
+@lru_cache(maxsize=None)
+def _s3_loader_cls():
+    from hr_bot.utils.s3_loader import S3DocumentLoader
+    return S3DocumentLoader
+
+
+def _fast_rmtree(path: Path):
+    """
+    Delete a directory tree, like shutil.rmtree but without its per-entry lstat.
+    
+    The file types come cached from os.scandir. Raises FileNotFoundError if ``path``
+    does not exist; any other OSError hands the rest over to shutil.rmtree.
+    """
+    root = os.fspath(path)
+    try:
+        dirs = [root]
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        dirs.append(e.path)
+                        stack.append(e.path)
+                    else:
+                        os.unlink(e.path)
+        # Children were found after their parents, so removing in reverse empties them first
+        for d in reversed(dirs):
+            os.rmdir(d)
+    except FileNotFoundError:
+        if not os.path.lexists(root):
+            raise
+        shutil.rmtree(root)
+    except OSError:
+        shutil.rmtree(root)
+
 
 class AdminServices:
     """Centralized admin operations and data gathering."""
@@ -22,19 +174,151 @@ class AdminServices:
         self.rag_index_dir = Path(".rag_index")
         self.stats_file = Path("data/admin_stats.json")
         
+        # Local S3 document cache, one directory per role
+        self._s3_cache_base = Path(os.getenv("S3_CACHE_DIR", tempfile.gettempdir())) / "hr_bot_s3_cache"
+        self._role_cache_dirs = {r: self._s3_cache_base / r for r in ("employee", "executive")}
+        # role -> (directory st_mtime_ns, document count)
+        self._role_doc_counts: Dict[str, Tuple[int, int]] = {}
+        
         # Ensure directories exist
         self.logs_dir.mkdir(parents=True, exist_ok=True)
         self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # queries.jsonl is consumed incrementally: only bytes past the offset are read
+        self._query_log_lock = threading.Lock()
+        self._query_log_offset = 0
+        self._query_total = 0
+        self._query_today_count = 0
+        self._query_today_date = None
+        self._query_log_inode: Optional[int] = None
+        self._recent_queries: deque = deque(maxlen=QUERY_LOG_TAIL)
+        
+        # Running response cache totals, valid while the directory mtime matches
+        self._cache_lock = threading.Lock()
+        self._cache_count = 0
+        self._cache_bytes = 0
+        self._cache_dir_mtime: Optional[int] = None
+        
+        # Audit log append handle, opened on first use and kept for the process lifetime
+        self._audit_fh = None
+        self._audit_lock = threading.Lock()
+        
+        # The counters above survive restarts via admin_stats.json, written behind:
+        # changes mark the state dirty and a timer flushes it at most every
+        # STATS_FLUSH_INTERVAL seconds (and once more at exit)
+        self._stats_dirty = False
+        self._stats_timer: Optional[threading.Timer] = None
+        self._stats_dirty_lock = threading.Lock()
+        self._stats_write_lock = threading.Lock()
+        self._load_stats_state()
+        atexit.register(self._flush_stats_state)
+    
+    # -------------------------------------------------------------------------
+    # Persisted counters
+    # -------------------------------------------------------------------------
+    
+    def _load_stats_state(self):
+        """Seed the query log and response cache counters from admin_stats.json."""
+        try:
+            state = _loads(self.stats_file.read_bytes())
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable {self.stats_file}: {e}")
+            return
+        
+        try:
+            q = state.get("query_log")
+            if q:
+                query_log = self.logs_dir / "queries.jsonl"
+                st = os.stat(query_log)
+                # Only trust the offset for the same file, and one that has not shrunk
+                if st.st_ino == q["inode"] and st.st_size >= q["offset"]:
+                    self._query_log_inode = q["inode"]
+                    self._query_log_offset = q["offset"]
+                    self._query_total = q["total"]
+                    self._query_today_count = q["today"]
+                    self._query_today_date = datetime.strptime(q["today_date"], "%Y-%m-%d").date()
+                    for entry in reversed(_tail_jsonl(query_log, QUERY_LOG_TAIL, end=q["offset"])):
+                        if isinstance(entry, dict):
+                            self._recent_queries.append(entry)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring stored query log counters: {e}")
+            self._reset_query_log()
+        
+        try:
+            c = state.get("response_cache")
+            if c:
+                # _cache_totals re-scans anyway if the directory changed since
+                self._cache_count = c["count"]
+                self._cache_bytes = c["bytes"]
+                self._cache_dir_mtime = c["dir_mtime_ns"]
+        except Exception as e:
+            logger.warning(f"Ignoring stored response cache counters: {e}")
+            self._cache_dir_mtime = None
+    
+    def _mark_stats_dirty(self):
+        """Schedule a write of the counters unless one is already pending."""
+        with self._stats_dirty_lock:
+            self._stats_dirty = True
+            if self._stats_timer is None:
+                self._stats_timer = threading.Timer(STATS_FLUSH_INTERVAL, self._flush_stats_state)
+                self._stats_timer.daemon = True
+                self._stats_timer.start()
+    
+    def _flush_stats_state(self):
+        """Write the counters to admin_stats.json (temp file + rename) if they changed."""
+        with self._stats_write_lock:
+            with self._stats_dirty_lock:
+                if self._stats_timer is not None:
+                    self._stats_timer.cancel()
+                    self._stats_timer = None
+                if not self._stats_dirty:
+                    return
+                self._stats_dirty = False
+            
+            state: Dict[str, Any] = {}
+            with self._query_log_lock:
+                if self._query_log_inode is not None and self._query_today_date is not None:
+                    state["query_log"] = {
+                        "inode": self._query_log_inode,
+                        "offset": self._query_log_offset,
+                        "total": self._query_total,
+                        "today": self._query_today_count,
+                        "today_date": self._query_today_date.isoformat(),
+                    }
+            with self._cache_lock:
+                if self._cache_dir_mtime is not None:
+                    state["response_cache"] = {
+                        "count": self._cache_count,
+                        "bytes": self._cache_bytes,
+                        "dir_mtime_ns": self._cache_dir_mtime,
+                    }
+            
+            tmp = self.stats_file.with_suffix(".tmp")
+            try:
+                tmp.write_bytes(_dumps_line(state))
+                os.replace(tmp, self.stats_file)
+            except Exception as e:
+                logger.error(f"Error writing {self.stats_file}: {e}")
     
     # -------------------------------------------------------------------------
     # Dashboard Stats
     # -------------------------------------------------------------------------
     
     def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Gather all dashboard statistics in a flat format for the template."""
+        """
+        Gather all dashboard statistics in a flat format for the template.
+        
+        Not memoized here: the admin routes cache the result briefly and drop it
+        after every action that changes it.
+        """
         cache = self.get_cache_stats()
         rag = self.get_rag_stats()
         query = self.get_query_stats()
+        n_users = len(_email_set("EMPLOYEE_EMAILS")) + len(_email_set("EXECUTIVE_EMAILS"))
         
         return {
             # Query stats
@@ -46,10 +330,8 @@ class AdminServices:
             "cache_entries": cache.get("total_entries", 0),
             
             # User stats - count from env lists
-            "active_users": len([e for e in os.getenv("EMPLOYEE_EMAILS", "").split(",") if e.strip()]) + \
-                           len([e for e in os.getenv("EXECUTIVE_EMAILS", "").split(",") if e.strip()]),
-            "total_users": len([e for e in os.getenv("EMPLOYEE_EMAILS", "").split(",") if e.strip()]) + \
-                          len([e for e in os.getenv("EXECUTIVE_EMAILS", "").split(",") if e.strip()]),
+            "active_users": n_users,
+            "total_users": n_users,
             
             # Document/RAG stats
             "documents_indexed": rag.get("indexed_documents", 0),
@@ -66,14 +348,92 @@ class AdminServices:
         }
     
     def _count_docs_for_role(self, role: str) -> int:
-        """Count cached documents for a role."""
-        import tempfile
-        cache_base = os.getenv("S3_CACHE_DIR", tempfile.gettempdir())
-        cache_dir = Path(cache_base) / "hr_bot_s3_cache" / role
+        """
+        Count cached documents for a role.
+        
+        The directory is only re-listed when its mtime changes, i.e. when files were
+        added, removed or renamed since the last count.
+        """
+        cache_dir = self._role_cache_dirs.get(role) or self._s3_cache_base / role
+        try:
+            mtime = cache_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._role_doc_counts.pop(role, None)
+            return 0
+        
+        cached = self._role_doc_counts.get(role)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        count = 0
+        try:
+            it = os.scandir(cache_dir)
+        except FileNotFoundError:
+            return 0
+        with it:
+            for e in it:
+                # The name check is free; dotfiles (e.g. .cache_metadata.json) never cost a stat
+                if e.name[0] == '.':
+                    continue
+                if e.is_file(follow_symlinks=False):
+                    count += 1
+        self._role_doc_counts[role] = (mtime, count)
+        return count
+    
+    def _scandir_json(self) -> Iterator[os.DirEntry]:
+        """
+        Yield the *.json entries of the response cache directory.
+        
+        DirEntry caches the result of stat(), so the size/mtime reads that follow
+        cost at most one syscall per file (pathlib re-stats on every call).
+        """
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    yield entry
+    
+    def _list_cache_files(self) -> Optional[List[os.DirEntry]]:
+        """List the *.json files in the response cache directory (None if it does not exist)."""
+        try:
+            return list(self._scandir_json())
+        except FileNotFoundError:
+            return None
+    
+    def _cache_totals(self) -> Optional[Tuple[int, int]]:
+        """
+        (entry count, total bytes) of the response cache, or None if it does not exist.
         
-        if cache_dir.exists():
-            return len([f for f in cache_dir.glob("*") if f.is_file() and not f.name.startswith(".")])
-        return 0
+        The totals are kept up to date by clear_cache and delete_cache_entry; the
+        directory is only re-scanned when its mtime shows that something else added,
+        removed or replaced files (ResponseCache writes via rename, so overwrites
+        count too).
+        """
+        with self._cache_lock:
+            mtime = self._cache_dir_mtime_now()
+            if mtime is None:
+                self._cache_dir_mtime = None
+                return None
+            if mtime != self._cache_dir_mtime:
+                count = 0
+                total = 0
+                for f in self._scandir_json():
+                    try:
+                        size = f.stat().st_size
+                    except FileNotFoundError:
+                        continue  # Removed or replaced since the listing
+                    if f.name != "cache_stats.json":
+                        count += 1
+                    total += size
+                self._cache_count, self._cache_bytes = count, total
+                self._cache_dir_mtime = mtime
+                self._mark_stats_dirty()
+            return self._cache_count, self._cache_bytes
+    
+    def _cache_dir_mtime_now(self) -> Optional[int]:
+        try:
+            return os.stat(self.cache_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get semantic cache statistics."""
@@ -90,29 +450,29 @@ class AdminServices:
         
         # Read cache stats file if exists
         cache_stats_file = self.cache_dir / "cache_stats.json"
-        if cache_stats_file.exists():
-            try:
-                with open(cache_stats_file, 'r') as f:
-                    saved = json.load(f)
-                    stats.update({
-                        "hits": saved.get("hits", 0),
-                        "misses": saved.get("misses", 0),
-                        "semantic_hits": saved.get("semantic_hits", 0),
-                        "exact_hits": saved.get("exact_hits", 0),
-                    })
-                    total = stats["hits"] + stats["misses"]
-                    if total > 0:
-                        stats["hit_rate"] = f"{stats['hits'] / total * 100:.1f}%"
-            except Exception as e:
-                logger.error(f"Error reading cache stats: {e}")
+        try:
+            with open(cache_stats_file, 'r') as f:
+                saved = json.load(f)
+                stats.update({
+                    "hits": saved.get("hits", 0),
+                    "misses": saved.get("misses", 0),
+                    "semantic_hits": saved.get("semantic_hits", 0),
+                    "exact_hits": saved.get("exact_hits", 0),
+                })
+                total = stats["hits"] + stats["misses"]
+                if total > 0:
+                    stats["hit_rate"] = f"{stats['hits'] / total * 100:.1f}%"
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading cache stats: {e}")
         
         # Count cache files
-        if self.cache_dir.exists():
-            cache_files = list(self.cache_dir.glob("*.json"))
-            stats["total_entries"] = len([f for f in cache_files if f.name != "cache_stats.json"])
+        totals = self._cache_totals()
+        if totals is not None:
+            stats["total_entries"], total_size = totals
             
             # Calculate disk size
-            total_size = sum(f.stat().st_size for f in cache_files if f.exists())
             if total_size > 1024 * 1024:
                 stats["disk_size"] = f"{total_size / 1024 / 1024:.1f} MB"
             else:
@@ -129,44 +489,85 @@ class AdminServices:
             "status": "Not Built",
         }
         
-        if self.rag_index_dir.exists():
-            # Count files in index
-            index_files = list(self.rag_index_dir.rglob("*"))
-            stats["indexed_documents"] = len([f for f in index_files if f.is_file()])
+        count, total_size, latest = self._rag_index_totals()
+        if count:
+            stats["indexed_documents"] = count
             
             # Calculate size
-            total_size = sum(f.stat().st_size for f in index_files if f.is_file())
             if total_size > 1024 * 1024:
                 stats["index_size"] = f"{total_size / 1024 / 1024:.1f} MB"
             else:
                 stats["index_size"] = f"{total_size / 1024:.1f} KB"
             
-            # Get last modified time
-            if index_files:
-                latest = max(f.stat().st_mtime for f in index_files if f.is_file())
-                stats["last_rebuild"] = datetime.fromtimestamp(latest).strftime("%Y-%m-%d %H:%M")
-                stats["status"] = "Ready"
+            stats["last_rebuild"] = datetime.fromtimestamp(latest).strftime("%Y-%m-%d %H:%M")
+            stats["status"] = "Ready"
         
         return stats
     
+    def _rag_index_totals(self) -> Tuple[int, int, float]:
+        """
+        File count, total size and build time of the RAG index.
+        
+        Read from the .meta.json sentinel the index builder writes after saving;
+        indexes built before it existed (or a damaged sentinel) fall back to a walk.
+        """
+        try:
+            with open(self.rag_index_dir / RAG_INDEX_META, 'rb') as f:
+                meta = _loads(f.read())
+            return int(meta["file_count"]), int(meta["total_size"]), float(meta["built_at"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable RAG index metadata: {e}")
+        return self._scan_rag()
+    
+    def _scan_rag(self) -> Tuple[int, int, float]:
+        """
+        File count, total size and newest mtime under the RAG index, in one walk.
+        
+        DirEntry caches the file type from the directory listing, so only regular
+        files cost a stat() call.
+        """
+        count = 0
+        total = 0
+        latest = 0.0
+        stack = [str(self.rag_index_dir)]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with it:
+                for e in it:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.is_file(follow_symlinks=False):
+                        if e.name.startswith(RAG_INDEX_META):
+                            continue
+                        try:
+                            st = e.stat()
+                        except FileNotFoundError:
+                            continue  # Removed by a concurrent rebuild
+                        count += 1
+                        total += st.st_size
+                        if st.st_mtime > latest:
+                            latest = st.st_mtime
+        return count, total, latest
+    
     def get_system_stats(self) -> Dict[str, Any]:
         """Get system statistics."""
-        import time
-        
         # Try to get process start time
         uptime = "Unknown"
-        try:
-            import psutil
-            process = psutil.Process()
-            start_time = datetime.fromtimestamp(process.create_time())
-            delta = datetime.now() - start_time
-            hours, remainder = divmod(int(delta.total_seconds()), 3600)
-            minutes, _ = divmod(remainder, 60)
-            uptime = f"{hours}h {minutes}m"
-        except ImportError:
-            pass  # psutil not installed
-        except Exception:
-            pass
+        if psutil is not None:
+            try:
+                process = psutil.Process()
+                start_time = datetime.fromtimestamp(process.create_time())
+                delta = datetime.now() - start_time
+                hours, remainder = divmod(int(delta.total_seconds()), 3600)
+                minutes, _ = divmod(remainder, 60)
+                uptime = f"{hours}h {minutes}m"
+            except Exception:
+                pass
         
         return {
             "uptime": uptime,
@@ -182,31 +583,109 @@ class AdminServices:
             "avg_response_time": "N/A",
         }
         
-        # Read from query log if exists
+        try:
+            with self._query_log_lock:
+                self._sync_query_log()
+                stats["today"] = self._query_today_count
+                stats["total"] = self._query_total
+        except Exception as e:
+            logger.error(f"Error reading query log: {e}")
+        
+        return stats
+    
+    def _reset_query_log(self):
+        """Forget everything read from queries.jsonl so the next sync starts from byte 0."""
+        self._query_log_offset = 0
+        self._query_total = 0
+        self._query_today_count = 0
+        self._query_today_date = None
+        self._query_log_inode = None
+        self._recent_queries.clear()
+    
+    def _sync_query_log(self):
+        """
+        Consume the lines appended to queries.jsonl since the last call.
+        
+        Only complete lines are parsed; a partially written last line is picked up next
+        time. A log that shrank (rotated or truncated) is re-read from the start. Caller
+        must hold _query_log_lock.
+        """
         query_log = self.logs_dir / "queries.jsonl"
-        if query_log.exists():
+        try:
+            st = os.stat(query_log)
+        except FileNotFoundError:
+            if self._query_log_inode is not None:
+                self._reset_query_log()
+                self._mark_stats_dirty()
+            return
+        size = st.st_size
+        if size < self._query_log_offset or st.st_ino != self._query_log_inode:
+            self._reset_query_log()
+            self._query_log_inode = st.st_ino
+        
+        today = datetime.now().date()
+        if today != self._query_today_date:
+            # Entries are appended in time order, so none read so far can be from the new day
+            self._query_today_date = today
+            self._query_today_count = 0
+            self._mark_stats_dirty()
+        
+        if size == self._query_log_offset:
+            return
+        with open(query_log, 'rb') as f:
+            f.seek(self._query_log_offset)
+            data = f.read(size - self._query_log_offset)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        self._query_log_offset += end
+        data = data[:end]
+        self._mark_stats_dirty()
+        
+        # Counting is done on the raw bytes; only the lines that can end up in the
+        # in-memory tail are parsed
+        self._query_total += data.count(b"\n")
+        day = today.isoformat().encode()
+        if data.count(b'"timestamp"') == data.count(b'"timestamp": "') + data.count(b'"timestamp":"'):
+            self._query_today_count += data.count(b'"timestamp": "' + day) + data.count(b'"timestamp":"' + day)
+        else:
+            # Unusual timestamp layout somewhere; fall back to parsing every line
+            for line in data.splitlines():
+                try:
+                    if _parse_iso(_loads(line).get("timestamp", "")).date() == today:
+                        self._query_today_count += 1
+                except Exception:
+                    pass
+        
+        start = end
+        for _ in range(QUERY_LOG_TAIL):
+            start = data.rfind(b"\n", 0, start - 1) + 1
+            if start == 0:
+                break
+        for line in data[start:].splitlines():
             try:
-                today = datetime.now().date()
-                total = 0
-                today_count = 0
-                
-                with open(query_log, 'r') as f:
-                    for line in f:
-                        total += 1
-                        try:
-                            entry = json.loads(line)
-                            ts = datetime.fromisoformat(entry.get("timestamp", ""))
-                            if ts.date() == today:
-                                today_count += 1
-                        except:
-                            pass
-                
-                stats["today"] = today_count
-                stats["total"] = total
-            except Exception as e:
-                logger.error(f"Error reading query log: {e}")
+                entry = _loads(line)
+            except Exception:
+                continue
+            if isinstance(entry, dict):
+                self._recent_queries.append(entry)
+    
+    def _recent_query_entries(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        The last ``limit`` parsed query log entries, oldest first.
         
-        return stats
+        Served from the in-memory tail when it is deep enough, otherwise by reading
+        back from the end of the file.
+        """
+        if limit <= QUERY_LOG_TAIL:
+            with self._query_log_lock:
+                self._sync_query_log()
+                n = len(self._recent_queries)
+                return list(islice(self._recent_queries, max(n - limit, 0), n))
+        
+        entries = _tail_jsonl(self.logs_dir / "queries.jsonl", limit)
+        entries.reverse()
+        return [e for e in entries if isinstance(e, dict)]
     
     # -------------------------------------------------------------------------
     # Cache Operations
@@ -215,66 +694,107 @@ class AdminServices:
     def clear_cache(self) -> Dict[str, Any]:
         """Clear all cached responses."""
         count = 0
-        if self.cache_dir.exists():
-            for f in self.cache_dir.glob("*.json"):
-                f.unlink()
-                count += 1
+        with self._cache_lock:
+            try:
+                for f in self._scandir_json():
+                    os.unlink(f.path)
+                    count += 1
+            except FileNotFoundError:
+                pass
+            self._cache_count = self._cache_bytes = 0
+            self._cache_dir_mtime = self._cache_dir_mtime_now()
+            self._mark_stats_dirty()
         
         self._log_admin_action("clear_cache", {"entries_cleared": count})
         return {"success": True, "entries_cleared": count}
     
     def get_cache_entries(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         """Get paginated list of cache entries."""
+        return self._cache_entries(self._list_cache_files(), limit, offset)
+    
+    def _cache_entries(self, cache_files: Optional[List[os.DirEntry]], limit: int, offset: int) -> List[Dict[str, Any]]:
+        """Paginated cache entries from an already-listed cache directory."""
         entries = []
         
-        if not self.cache_dir.exists():
+        if cache_files is None:
             return entries
         
-        cache_files = sorted(
-            [f for f in self.cache_dir.glob("*.json") if f.name != "cache_stats.json"],
-            key=lambda f: f.stat().st_mtime,
-            reverse=True
-        )
+        # Stat each file once, in the filtering pass, rather than once per sort key comparison
+        items = []
+        for f in cache_files:
+            if f.name == "cache_stats.json":
+                continue
+            try:
+                items.append((f, f.stat()))
+            except FileNotFoundError:
+                continue  # Removed or replaced since the listing
+        items.sort(key=lambda t: t[1].st_mtime, reverse=True)
         
-        for f in cache_files[offset:offset + limit]:
+        for f, st in items[offset:offset + limit]:
             try:
-                with open(f, 'r') as file:
-                    data = json.load(file)
+                with open(f.path, 'rb') as file:
+                    data = _loads(file.read())
                     # Get timestamp and calculate expiry
                     ts = data.get("timestamp", "")
                     created = ts
                     expires = "Unknown"
                     if ts:
                         try:
-                            created_dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                            ttl_hours = int(os.getenv("CACHE_TTL_HOURS", "72"))
-                            expires_dt = created_dt + timedelta(hours=ttl_hours)
+                            created_dt = _parse_iso(ts)
+                            expires_dt = created_dt + _cache_ttl()
                             created = created_dt.strftime("%Y-%m-%d %H:%M")
                             expires = expires_dt.strftime("%Y-%m-%d %H:%M")
                         except:
                             pass
                     
                     entries.append({
-                        "id": f.stem,
+                        "id": f.name[:-len(".json")],
                         "query": data.get("query_preview", data.get("query", ""))[:80],
                         "created": created,
                         "expires": expires,
                         "hits": data.get("hits", 1),
-                        "size": f"{f.stat().st_size / 1024:.1f} KB"
+                        "size": f"{st.st_size / 1024:.1f} KB"
                     })
             except Exception:
                 pass
         
         return entries
     
+    async def get_cache_page_bundle(self, limit: int = 50) -> Dict[str, Any]:
+        """
+        Everything the cache page shows, built in a worker thread.
+        
+        The entries come from one listing of the cache directory; the stats reuse the
+        running totals and only re-scan if the directory mtime has changed.
+        """
+        return await asyncio.to_thread(self._cache_page_bundle, limit)
+    
+    def _cache_page_bundle(self, limit: int) -> Dict[str, Any]:
+        cache_files = self._list_cache_files()
+        return {
+            "stats": self.get_cache_stats(),
+            "entries": self._cache_entries(cache_files, limit, 0),
+        }
+    
     def delete_cache_entry(self, entry_id: str) -> bool:
         """Delete a specific cache entry."""
         cache_file = self.cache_dir / f"{entry_id}.json"
-        if cache_file.exists():
-            cache_file.unlink()
-            self._log_admin_action("delete_cache_entry", {"entry_id": entry_id})
-            return True
-        return False
+        with self._cache_lock:
+            # The totals can only be adjusted if nothing else changed the directory first
+            current = self._cache_dir_mtime is not None and self._cache_dir_mtime_now() == self._cache_dir_mtime
+            try:
+                size = cache_file.stat().st_size
+                cache_file.unlink()
+            except FileNotFoundError:
+                return False
+            if current:
+                if cache_file.name != "cache_stats.json":
+                    self._cache_count -= 1
+                self._cache_bytes -= size
+                self._cache_dir_mtime = self._cache_dir_mtime_now()
+                self._mark_stats_dirty()
+        self._log_admin_action("delete_cache_entry", {"entry_id": entry_id})
+        return True
     
     # -------------------------------------------------------------------------
     # RAG Operations
@@ -282,12 +802,13 @@ class AdminServices:
     
     def rebuild_rag_index(self) -> Dict[str, Any]:
         """Trigger RAG index rebuild by clearing index directory."""
-        if self.rag_index_dir.exists():
-            shutil.rmtree(self.rag_index_dir)
+        try:
+            _fast_rmtree(self.rag_index_dir)
+        except FileNotFoundError:
+            pass
         
         # Clear bot cache to force reinitialization
-        from hr_bot.crew import HrBot
-        HrBot.clear_rag_cache()
+        _hr_bot_cls().clear_rag_cache()
         
         self._log_admin_action("rebuild_rag_index", {})
         return {"success": True, "message": "RAG index cleared. Will rebuild on next query."}
@@ -295,9 +816,7 @@ class AdminServices:
     def test_rag_search(self, query: str) -> Dict[str, Any]:
         """Test RAG search with a query."""
         try:
-            from hr_bot.tools.hybrid_rag_tool import HybridRAGTool
-            
-            tool = HybridRAGTool(user_role="employee")
+            tool = _hybrid_rag_tool_cls()(user_role="employee")
             results = tool.retriever.hybrid_search(query, top_k=5)
             
             return {
@@ -322,24 +841,19 @@ class AdminServices:
         """Get all configured users as a flat list."""
         users = []
         
-        admin_emails = set(e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip())
-        exec_emails = set(e.strip().lower() for e in os.getenv("EXECUTIVE_EMAILS", "").split(",") if e.strip())
-        emp_emails = set(e.strip().lower() for e in os.getenv("EMPLOYEE_EMAILS", "").split(",") if e.strip())
+        admin_emails = _email_set("ADMIN_EMAILS")
+        exec_emails = _email_set("EXECUTIVE_EMAILS")
+        emp_emails = _email_set("EMPLOYEE_EMAILS")
         
-        # All unique emails
-        all_emails = admin_emails | exec_emails | emp_emails
+        # Role per unique email; executive takes precedence, admin-only emails count as employees
+        role_map: Dict[str, str] = dict.fromkeys(admin_emails | emp_emails, "employee")
+        role_map.update(dict.fromkeys(exec_emails, "executive"))
         
-        for email in sorted(all_emails):
-            # Determine role (executive takes precedence)
-            if email in exec_emails:
-                role = "executive"
-            else:
-                role = "employee"
-            
+        for email in sorted(role_map):
             users.append({
                 "email": email,
-                "name": email.split("@")[0].replace(".", " ").title(),
-                "role": role,
+                "name": email.partition("@")[0].replace(".", " ").title(),
+                "role": role_map[email],
                 "is_admin": email in admin_emails,
                 "last_active": None,  # Would need session tracking
             })
@@ -348,28 +862,34 @@ class AdminServices:
     
     def get_admin_emails(self) -> List[str]:
         """Get list of admin emails for display."""
-        return [e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()]
+        return sorted(_email_set("ADMIN_EMAILS"))
+    
+    async def get_users_page_bundle(self) -> Dict[str, Any]:
+        """Everything the users page shows, built in a worker thread."""
+        return await asyncio.to_thread(self._users_page_bundle)
+    
+    def _users_page_bundle(self) -> Dict[str, Any]:
+        return {
+            "users": self.get_users(),
+            "admin_emails": self.get_admin_emails(),
+        }
 
     def list_log_users(self, limit: int = 500) -> List[str]:
         """List distinct users seen in recent query logs."""
+        try:
+            return self._log_users(self._recent_query_entries(limit))
+        except Exception:
+            return []
+    
+    def _log_users(self, entries: List[Dict[str, Any]]) -> List[str]:
+        """Distinct users among the given query log entries."""
         users = []
         seen = set()
-        query_log = self.logs_dir / "queries.jsonl"
-        if query_log.exists():
-            try:
-                with open(query_log, 'r') as f:
-                    lines = f.readlines()
-                    for line in reversed(lines[-limit:]):
-                        try:
-                            entry = json.loads(line)
-                        except Exception:
-                            continue
-                        u = entry.get("user")
-                        if u and u.lower() not in seen:
-                            seen.add(u.lower())
-                            users.append(u)
-            except Exception:
-                pass
+        for entry in reversed(entries):
+            u = entry.get("user")
+            if u and u.lower() not in seen:
+                seen.add(u.lower())
+                users.append(u)
         return sorted(users, key=lambda x: x.lower())
     
     # -------------------------------------------------------------------------
@@ -384,63 +904,96 @@ class AdminServices:
         search: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get recent query logs with optional filters."""
+        try:
+            entries = self._recent_query_entries(limit)
+        except Exception as e:
+            logger.error(f"Error reading query logs: {e}")
+            return []
+        return self._filter_query_logs(entries, limit, user, source, search)
+    
+    def _filter_query_logs(
+        self,
+        entries: List[Dict[str, Any]],
+        limit: int,
+        user: Optional[str] = None,
+        source: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first query log entries matching the filters."""
         logs: List[Dict[str, Any]] = []
-        query_log = self.logs_dir / "queries.jsonl"
-        
-        if query_log.exists():
-            try:
-                with open(query_log, 'r') as f:
-                    lines = f.readlines()
-                    for line in reversed(lines[-limit:]):
-                        try:
-                            entry = json.loads(line)
-                        except Exception:
-                            continue
+        for entry in reversed(entries[-limit:]):
+            if user and entry.get("user", "").lower() != user.lower():
+                continue
+            if source:
+                is_cached = bool(entry.get("cached"))
+                if source.lower() == "cached" and not is_cached:
+                    continue
+                if source.lower() == "rag" and is_cached:
+                    continue
+            if search:
+                q = entry.get("query", "")
+                if search.lower() not in q.lower():
+                    continue
 
-                        if user and entry.get("user", "").lower() != user.lower():
-                            continue
-                        if source:
-                            is_cached = bool(entry.get("cached"))
-                            if source.lower() == "cached" and not is_cached:
-                                continue
-                            if source.lower() == "rag" and is_cached:
-                                continue
-                        if search:
-                            q = entry.get("query", "")
-                            if search.lower() not in q.lower():
-                                continue
-
-                        logs.append(entry)
-                        if len(logs) >= limit:
-                            break
-            except Exception as e:
-                logger.error(f"Error reading query logs: {e}")
-        
+            logs.append(entry)
+            if len(logs) >= limit:
+                break
         return logs
     
     def get_admin_audit_log(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get admin action audit log."""
-        logs = []
-        audit_log = self.logs_dir / "admin_audit.jsonl"
-        
-        if audit_log.exists():
-            try:
-                with open(audit_log, 'r') as f:
-                    lines = f.readlines()
-                    for line in reversed(lines[-limit:]):
-                        try:
-                            logs.append(json.loads(line))
-                        except:
-                            pass
-            except Exception as e:
-                logger.error(f"Error reading audit logs: {e}")
-        
-        return logs
+        try:
+            return _tail_jsonl(self.logs_dir / "admin_audit.jsonl", limit)
+        except Exception as e:
+            logger.error(f"Error reading audit logs: {e}")
+            return []
+    
+    async def get_logs_page_bundle(
+        self,
+        limit: int = 200,
+        user: Optional[str] = None,
+        source: Optional[str] = None,
+        search: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Everything the logs page shows; queries.jsonl is read once for both the logs and
+        the user list, while the audit log is read concurrently in another thread.
+        """
+        (query_logs, users), audit_logs = await asyncio.gather(
+            asyncio.to_thread(self._query_log_view, limit, user, source, search),
+            asyncio.to_thread(self.get_admin_audit_log, 50),
+        )
+        return {
+            "query_logs": query_logs,
+            "audit_logs": audit_logs,
+            "users": users,
+        }
+    
+    def _query_log_view(
+        self,
+        limit: int,
+        user: Optional[str],
+        source: Optional[str],
+        search: Optional[str],
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Filtered query logs and the distinct log users, from one sync of queries.jsonl."""
+        try:
+            entries = self._recent_query_entries(max(limit, QUERY_LOG_TAIL))
+        except Exception as e:
+            logger.error(f"Error reading query logs: {e}")
+            entries = []
+        return (
+            self._filter_query_logs(entries, limit, user, source, search),
+            self._log_users(entries[-QUERY_LOG_TAIL:]),
+        )
     
     def _log_admin_action(self, action: str, details: Dict[str, Any], admin_email: str = "unknown"):
-        """Log an admin action to audit log."""
-        audit_log = self.logs_dir / "admin_audit.jsonl"
+        """
+        Log an admin action to audit log.
         
+        Appends through one long-lived handle instead of an open/close per action; each
+        record is flushed straight away so the logs page sees it.
+        """
         entry = {
             "timestamp": datetime.now().isoformat(),
             "admin": admin_email,
@@ -449,8 +1002,20 @@ class AdminServices:
         }
         
         try:
-            with open(audit_log, 'a') as f:
-                f.write(json.dumps(entry) + "\n")
+            line = _dumps_line(entry)
+            with self._audit_lock:
+                if self._audit_fh is None:
+                    self._audit_fh = open(self.logs_dir / "admin_audit.jsonl", 'ab', buffering=8192)
+                    atexit.register(self._audit_fh.close)
+                try:
+                    self._audit_fh.write(line)
+                    self._audit_fh.flush()
+                except OSError:
+                    # Reopen on the next action rather than keep writing to a broken handle
+                    fh, self._audit_fh = self._audit_fh, None
+                    atexit.unregister(fh.close)
+                    fh.close()
+                    raise
         except Exception as e:
             logger.error(f"Error writing audit log: {e}")
     
@@ -461,16 +1026,16 @@ class AdminServices:
     def refresh_s3_documents(self, role: str = "employee") -> Dict[str, Any]:
         """Force refresh documents from S3."""
         try:
-            from hr_bot.utils.s3_loader import S3DocumentLoader
-            from hr_bot.crew import HrBot
-            
-            loader = S3DocumentLoader(user_role=role)
+            HrBot = _hr_bot_cls()
+            loader = _s3_loader_cls()(user_role=role)
             loader.clear_cache()
             document_paths = loader.load_documents(force_refresh=True)
             
-            # Clear RAG index
-            if self.rag_index_dir.exists():
-                shutil.rmtree(self.rag_index_dir)
+            # Clear RAG index; the other role's refresh may have removed it already
+            try:
+                _fast_rmtree(self.rag_index_dir)
+            except FileNotFoundError:
+                pass
             
             HrBot.clear_rag_cache()
             
@@ -497,24 +1062,30 @@ class AdminServices:
         }
         
         # Check S3 cache metadata
-        import tempfile
-        cache_base = os.getenv("S3_CACHE_DIR", tempfile.gettempdir())
-        
-        for role in ["employee", "executive"]:
-            cache_dir = Path(cache_base) / "hr_bot_s3_cache" / role
-            metadata_file = cache_dir / ".cache_metadata.json"
-            
-            if metadata_file.exists():
-                try:
-                    with open(metadata_file, 'r') as f:
-                        meta = json.load(f)
-                        stats["last_sync"] = meta.get("last_sync", "Unknown")
-                        stats["total_documents"] = meta.get("file_count", 0)
-                except:
-                    pass
-                break
+        for cache_dir in self._role_cache_dirs.values():
+            try:
+                with open(cache_dir / ".cache_metadata.json", 'r') as f:
+                    meta = json.load(f)
+                    stats["last_sync"] = meta.get("last_sync", "Unknown")
+                    stats["total_documents"] = meta.get("file_count", 0)
+            except FileNotFoundError:
+                continue
+            except:
+                pass
+            break
         
         return stats
+    
+    async def get_rag_page_bundle(self) -> Dict[str, Any]:
+        """Everything the RAG page shows; the index walk and the S3 metadata reads run concurrently."""
+        rag_stats, doc_stats = await asyncio.gather(
+            asyncio.to_thread(self.get_rag_stats),
+            asyncio.to_thread(self.get_document_stats),
+        )
+        return {
+            "rag_stats": rag_stats,
+            "doc_stats": doc_stats,
+        }
 
 
 # Singleton instance
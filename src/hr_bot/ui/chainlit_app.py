@@ -14,7 +14,6 @@ from typing import Dict, List, Optional
 import chainlit as cl
 from starlette.datastructures import Headers
 from starlette.routing import Mount
-from starlette.staticfiles import StaticFiles
 
 from hr_bot.crew import HrBot
 from hr_bot.utils.s3_loader import S3DocumentLoader
@@ -22,12 +21,12 @@ from hr_bot.utils.s3_loader import S3DocumentLoader
 # Import admin routes
 try:
     from hr_bot.ui.admin import admin_routes
-    from hr_bot.ui.admin.routes import STATIC_DIR as ADMIN_STATIC_DIR
+    from hr_bot.ui.admin.routes import admin_static
     ADMIN_AVAILABLE = True
 except ImportError as e:
     logging.getLogger("hr_bot.chainlit").warning("Admin module not available: %s", e)
     admin_routes = None
-    ADMIN_STATIC_DIR = None
+    admin_static = None
     ADMIN_AVAILABLE = False
 
 logger = logging.getLogger("hr_bot.chainlit")
@@ -46,19 +45,14 @@ if ADMIN_AVAILABLE and admin_routes is not None:
         # Create route mounts for admin
         admin_mount = Mount("/admin", app=admin_routes)
         
-        # Mount static files for admin CSS/JS
-        if ADMIN_STATIC_DIR and ADMIN_STATIC_DIR.exists():
-            static_mount = Mount(
-                "/admin/static",
-                app=StaticFiles(directory=str(ADMIN_STATIC_DIR)),
-                name="admin_static"
-            )
-            # Insert static route at the beginning so it takes precedence
-            chainlit_app.routes.insert(0, static_mount)
-        
         # Insert admin route at the beginning so it takes precedence over catch-all
         chainlit_app.routes.insert(0, admin_mount)
         
+        # Mount static files for admin CSS/JS; inserted after (so ahead of) the
+        # /admin mount, which would otherwise swallow /admin/static/* as well
+        static_mount = Mount("/admin/static", app=admin_static, name="admin_static")
+        chainlit_app.routes.insert(0, static_mount)
+        
         logger.info("Admin console mounted at /admin")
     except Exception as e:
         logger.error("Failed to mount admin routes: %s", e)
@@ -16,6 +16,19 @@ import re
 logger = logging.getLogger(__name__)
 
 
+def _write_json_atomic(path: Path, data: Any, **dump_kwargs):
+    """
+    Write JSON to a temp file and rename it over ``path``.
+    
+    The rename changes the cache directory's mtime, which is how the admin
+    dashboard notices overwrites without re-scanning on every read.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp, path)
+
+
 class ResponseCache:
     """
     High-performance SEMANTIC caching system for HR Bot responses.
@@ -440,13 +453,12 @@ class ResponseCache:
         # Save to disk cache
         try:
             cache_file = self.cache_dir / f"{cache_key}.json"
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "response": response,
-                    "timestamp": timestamp.isoformat(),
-                    "query_preview": query[:100],  # For debugging
-                    "context_preview": context[:50] if context else ""
-                }, f, indent=2, ensure_ascii=False)
+            _write_json_atomic(cache_file, {
+                "response": response,
+                "timestamp": timestamp.isoformat(),
+                "query_preview": query[:100],  # For debugging
+                "context_preview": context[:50] if context else ""
+            }, indent=2, ensure_ascii=False)
             
             # Add to query index for semantic search
             keywords = self._extract_keywords(query)
@@ -563,8 +575,7 @@ class ResponseCache:
         """Save cache statistics to disk"""
         stats_file = self.cache_dir / "cache_stats.json"
         try:
-            with open(stats_file, 'w') as f:
-                json.dump(self.stats, f, indent=2)
+            _write_json_atomic(stats_file, self.stats, indent=2)
         except Exception as e:
             logger.error(f"Error saving cache stats: {e}")
     
@@ -9,10 +9,23 @@ import tempfile
 import time
 import json
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
+# Concurrent S3 GETs when (re)filling the local cache; downloads are latency-bound.
+# Overridable per call through S3_DOWNLOAD_WORKERS.
+DEFAULT_DOWNLOAD_WORKERS = 8
+
+
+def _download_workers() -> int:
+    """S3_DOWNLOAD_WORKERS, or the default if unset or not an integer; at least 1"""
+    try:
+        return max(1, int(os.getenv("S3_DOWNLOAD_WORKERS", DEFAULT_DOWNLOAD_WORKERS)))
+    except ValueError:
+        return DEFAULT_DOWNLOAD_WORKERS
+
 
 class S3DocumentLoader:
     """
@@ -367,13 +380,16 @@ class S3DocumentLoader:
             print(f"⚠️  No documents found in s3://{self.bucket_name}/{self.s3_prefix}")
             return []
         
-        # Download each document
-        local_paths = []
-        for i, s3_key in enumerate(document_keys, 1):
+        # Download documents concurrently (boto3 clients are thread-safe); map() keeps
+        # the listing order, so the manifest is the same as with serial downloads
+        def _fetch(item: Tuple[int, str]) -> Optional[str]:
+            i, s3_key = item
             print(f"⬇️  Downloading {i}/{len(document_keys)}: {os.path.basename(s3_key)}")
-            local_path = self._download_document(s3_key)
-            if local_path:
-                local_paths.append(local_path)
+            return self._download_document(s3_key)
+        
+        workers = min(_download_workers(), len(document_keys))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-download") as ex:
+            local_paths = [p for p in ex.map(_fetch, enumerate(document_keys, 1)) if p]
         
         print(f"✅ Downloaded {len(local_paths)} documents to cache")
         return local_paths
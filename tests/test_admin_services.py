@@ -0,0 +1,143 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from hr_bot.ui.admin import services
+from hr_bot.ui.admin.services import AdminServices, _tail_jsonl
+
+"""Tests for the admin dashboard's query log counters.
+
+queries.jsonl is consumed incrementally (byte offset + inode), so these cover
+the cases where that bookkeeping can drift from a full re-read: partial lines,
+rotation, the day rolling over and the counters persisted across restarts.
+"""
+
+
+def _line(query: str, when: datetime) -> str:
+    # Same layout the Chainlit app and the API server append
+    return json.dumps({"timestamp": when.strftime("%Y-%m-%d %H:%M:%S"), "user": "a@b.com", "query": query}) + "\n"
+
+
+@pytest.fixture
+def admin(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    svc = AdminServices()
+    yield svc
+    svc._flush_stats_state()  # also cancels a pending write-behind timer
+
+
+def _query_log(svc: AdminServices):
+    return svc.logs_dir / "queries.jsonl"
+
+
+def _append(svc: AdminServices, text: str):
+    with open(_query_log(svc), "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _sync(svc: AdminServices):
+    with svc._query_log_lock:
+        svc._sync_query_log()
+
+
+def test_tail_jsonl_newest_first_and_limited(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(50)))
+    assert [r["n"] for r in _tail_jsonl(path, 3)] == [49, 48, 47]
+    # A block smaller than a line still yields whole records
+    assert [r["n"] for r in _tail_jsonl(path, 3, block=4)] == [49, 48, 47]
+    assert len(_tail_jsonl(path, 500)) == 50
+    assert _tail_jsonl(path, 0) == []
+
+
+def test_tail_jsonl_skips_bad_lines_and_honours_end(tmp_path):
+    path = tmp_path / "log.jsonl"
+    first = json.dumps({"n": 1}) + "\n"
+    path.write_text(first + "not json\n" + json.dumps({"n": 2}) + "\n")
+    assert [r["n"] for r in _tail_jsonl(path, 10)] == [2, 1]
+    assert [r["n"] for r in _tail_jsonl(path, 10, end=len(first))] == [1]
+    assert _tail_jsonl(tmp_path / "missing.jsonl", 10) == []
+
+
+def test_sync_counts_today_and_waits_for_partial_lines(admin):
+    now = datetime.now()
+    _append(admin, _line("old", now - timedelta(days=2)) + _line("new", now))
+    partial = _line("pending", now)
+    _append(admin, partial[:10])
+
+    stats = admin.get_query_stats()
+    assert (stats["total"], stats["today"]) == (2, 1)
+
+    _append(admin, partial[10:])
+    stats = admin.get_query_stats()
+    assert (stats["total"], stats["today"]) == (3, 2)
+    assert [e["query"] for e in admin._recent_query_entries(2)] == ["new", "pending"]
+
+
+def test_sync_rereads_a_rotated_log(admin):
+    now = datetime.now()
+    _append(admin, _line("a", now) + _line("b", now) + _line("c", now))
+    _sync(admin)
+    assert admin._query_total == 3
+
+    # Replaced by a new file (new inode), as log rotation does
+    rotated = _query_log(admin).with_suffix(".new")
+    rotated.write_text(_line("x" * 40, now) + _line("y" * 40, now))
+    os.replace(rotated, _query_log(admin))
+    _sync(admin)
+    assert admin._query_total == 2
+    assert [e["query"][0] for e in admin._recent_query_entries(10)] == ["x", "y"]
+
+
+def test_sync_restarts_today_count_on_a_new_day(admin, monkeypatch):
+    now = datetime.now()
+    _append(admin, _line("q1", now) + _line("q2", now))
+    _sync(admin)
+    assert admin._query_today_count == 2
+
+    class Tomorrow(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now + timedelta(days=1)
+
+    monkeypatch.setattr(services, "datetime", Tomorrow)
+    _append(admin, _line("q3", now + timedelta(days=1)))
+    stats = admin.get_query_stats()
+    assert (stats["total"], stats["today"]) == (3, 1)
+
+
+def test_counters_survive_restart(admin):
+    now = datetime.now()
+    _append(admin, _line("before", now - timedelta(days=1)) + _line("today", now))
+    _sync(admin)
+    admin._flush_stats_state()
+
+    # Lines appended while the process was down are picked up from the stored offset
+    _append(admin, _line("while down", now))
+    restarted = AdminServices()
+    try:
+        assert restarted._query_log_offset > 0
+        stats = restarted.get_query_stats()
+        assert (stats["total"], stats["today"]) == (3, 2)
+        assert [e["query"] for e in restarted._recent_query_entries(3)] == ["before", "today", "while down"]
+    finally:
+        restarted._flush_stats_state()
+
+
+def test_stored_offset_ignored_for_a_different_file(admin):
+    now = datetime.now()
+    _append(admin, _line("a", now) + _line("b", now))
+    _sync(admin)
+    admin._flush_stats_state()
+
+    replacement = _query_log(admin).with_suffix(".new")
+    replacement.write_text(_line("c" * 80, now))
+    os.replace(replacement, _query_log(admin))
+    restarted = AdminServices()
+    try:
+        assert restarted._query_log_offset == 0
+        assert restarted.get_query_stats()["total"] == 1
+    finally:
+        restarted._flush_stats_state()
@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from hr_bot.tools.master_actions_tool import BM25Index, ChunkStore, _rrf_fuse, _tokenize
+
+"""Tests for the Master Actions retriever's index pieces: BM25 postings, RRF fusion and the chunk store."""
+
+CORPUS = [
+    "how to apply leave in the portal",
+    "download your payslip from the payroll portal",
+    "apply for reimbursement of travel expenses",
+    "leave balance and leave calendar",
+]
+
+
+@pytest.fixture
+def bm25():
+    return BM25Index.build([_tokenize(text) for text in CORPUS])
+
+
+def _reference_score(term: str, doc_id: int, k1: float = 1.5, b: float = 0.75) -> float:
+    """Lucene-variant BM25 for one term, computed the slow way"""
+    docs = [_tokenize(text) for text in CORPUS]
+    n = len(docs)
+    df = sum(1 for tokens in docs if term in tokens)
+    avgdl = sum(len(tokens) for tokens in docs) / n
+    tf = docs[doc_id].count(term)
+    idf = math.log1p((n - df + 0.5) / (df + 0.5))
+    return idf * tf / (tf + k1 * (1 - b + b * len(docs[doc_id]) / avgdl))
+
+
+def test_bm25_scores_match_reference(bm25):
+    scores = bm25.get_scores(["leave", "portal"])
+    for doc_id in range(len(CORPUS)):
+        expected = _reference_score("leave", doc_id) + _reference_score("portal", doc_id)
+        assert scores[doc_id] == pytest.approx(expected, rel=1e-5)
+
+
+def test_bm25_unknown_terms_score_zero(bm25):
+    assert not bm25.get_scores(["nonexistent"]).any()
+    ids, scores = bm25.top_n(["nonexistent"], 3)
+    assert len(ids) == 0 and len(scores) == 0
+
+
+def test_bm25_top_n_is_best_first_and_drops_non_matches(bm25):
+    ids, scores = bm25.top_n(["leave"], 10)
+    # "leave balance and leave calendar" has the term twice
+    assert ids.tolist()[0] == 3
+    assert set(ids.tolist()) == {0, 3}
+    assert list(scores) == sorted(scores, reverse=True)
+    assert (scores > 0).all()
+
+
+def test_bm25_max_score_bounds_top_score(bm25):
+    for query in (["leave"], ["apply", "leave"], ["payslip", "portal"]):
+        _, scores = bm25.top_n(query, 1)
+        assert bm25.max_score(query) >= scores[0] - 1e-6
+
+
+def test_bm25_save_load_roundtrip(bm25, tmp_path):
+    bm25.save(tmp_path / "bm25", index_hash="abc")
+    loaded, meta = BM25Index.load(tmp_path / "bm25")
+    assert meta == {"index_hash": "abc"}
+    assert loaded.vocab == bm25.vocab
+    np.testing.assert_array_equal(loaded.get_scores(["apply", "leave"]), bm25.get_scores(["apply", "leave"]))
+
+
+def test_rrf_fuse_rewards_agreement_and_respects_weights():
+    # 2 is ranked in both lists, so it beats each list's own top hit
+    assert _rrf_fuse([[1, 2], [3, 2]], [1.0, 1.0])[0] == 2
+    # With one list silenced its order is ignored
+    assert _rrf_fuse([[1, 2, 3], [3, 2, 1]], [1.0, 0.0]) == [1, 2, 3]
+
+
+def test_chunk_store_reads_back_documents(tmp_path):
+    path = tmp_path / "chunks.sqlite"
+    docs = [Document(page_content=text, metadata={"chunk_id": idx, "source": "guide.docx"}) for idx, text in enumerate(CORPUS)]
+    ChunkStore.write(path, docs)
+
+    store = ChunkStore(path)
+    assert len(store) == len(CORPUS)
+    assert store[2].page_content == CORPUS[2]
+    assert store[2].metadata == {"chunk_id": 2, "source": "guide.docx"}
+    assert store[2] is store[2]  # memoized
+    assert [doc.page_content for doc in store] == CORPUS
+    with pytest.raises(IndexError):
+        store[len(CORPUS)]
+
+
+def test_chunk_store_write_replaces_existing_file(tmp_path):
+    path = tmp_path / "chunks.sqlite"
+    ChunkStore.write(path, [Document(page_content="old", metadata={})])
+    ChunkStore.write(path, [Document(page_content="new", metadata={}), Document(page_content="more", metadata={})])
+    store = ChunkStore(path)
+    assert len(store) == 2
+    assert store[0].page_content == "new"